@@ -0,0 +1,31 @@
+"""Add pre-rendered audio columns to content
+
+Revision ID: 0003_content_audio
+Revises: 0002_add_admins_table
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0003_content_audio'
+down_revision = '0002_add_admins_table'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('content', sa.Column('audio_status', sa.String(length=20), nullable=True))
+    op.add_column('content', sa.Column('audio_path', sa.String(length=500), nullable=True))
+    op.add_column('content', sa.Column('audio_digest', sa.String(length=64), nullable=True))
+    op.add_column('content', sa.Column('audio_manifest', sa.JSON(), nullable=True))
+    op.add_column('content', sa.Column('audio_rendered_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('content', 'audio_rendered_at')
+    op.drop_column('content', 'audio_manifest')
+    op.drop_column('content', 'audio_digest')
+    op.drop_column('content', 'audio_path')
+    op.drop_column('content', 'audio_status')
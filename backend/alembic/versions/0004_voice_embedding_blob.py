@@ -0,0 +1,58 @@
+"""Store voice profile embeddings as packed float32
+
+Revision ID: 0004_voice_embedding_blob
+Revises: 0003_content_audio
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+import json
+import struct
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0004_voice_embedding_blob'
+down_revision = '0003_content_audio'
+branch_labels = None
+depends_on = None
+
+# Same layout as app.models.voice_profile.pack_embedding, frozen for this revision
+_HEADER = struct.Struct('<2sHI')
+
+
+def _pack(vector) -> bytes:
+    return _HEADER.pack(b'VE', 1, len(vector)) + struct.pack(f'<{len(vector)}f', *vector)
+
+
+def _unpack(blob: bytes) -> list:
+    _, _, dim = _HEADER.unpack_from(blob)
+    return list(struct.unpack_from(f'<{dim}f', blob, _HEADER.size))
+
+
+def upgrade() -> None:
+    op.add_column('voice_profiles', sa.Column('embedding', sa.LargeBinary(), nullable=True))
+    conn = op.get_bind()
+    rows = conn.execute(sa.text('SELECT id, embeddings FROM voice_profiles')).fetchall()
+    for row_id, embeddings in rows:
+        if isinstance(embeddings, str):
+            embeddings = json.loads(embeddings)
+        vector = (embeddings or {}).get('vector')
+        if vector:
+            conn.execute(
+                sa.text('UPDATE voice_profiles SET embedding = :blob WHERE id = :id'),
+                {'blob': _pack(vector), 'id': row_id},
+            )
+    op.drop_column('voice_profiles', 'embeddings')
+
+
+def downgrade() -> None:
+    op.add_column('voice_profiles', sa.Column('embeddings', sa.JSON(), nullable=False, server_default=sa.text("'{}'")))
+    conn = op.get_bind()
+    rows = conn.execute(sa.text('SELECT id, embedding FROM voice_profiles WHERE embedding IS NOT NULL')).fetchall()
+    for row_id, blob in rows:
+        conn.execute(
+            sa.text('UPDATE voice_profiles SET embeddings = :embeddings WHERE id = :id'),
+            {'embeddings': json.dumps({'vector': _unpack(bytes(blob))}), 'id': row_id},
+        )
+    op.drop_column('voice_profiles', 'embedding')
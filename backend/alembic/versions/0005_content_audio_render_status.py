@@ -0,0 +1,35 @@
+"""Track content audio renders separately from the served artifact
+
+Revision ID: 0005_content_audio_render_status
+Revises: 0004_voice_embedding_blob
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0005_content_audio_render_status'
+down_revision = '0004_voice_embedding_blob'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('content', sa.Column('audio_render_status', sa.String(length=20), nullable=True))
+    # In-flight and failed states move to the new column; a row keeps serving
+    # its artifact if one was rendered before
+    op.execute(
+        "UPDATE content SET audio_render_status = audio_status, "
+        "audio_status = CASE WHEN audio_path IS NOT NULL THEN 'ready' ELSE NULL END "
+        "WHERE audio_status IN ('rendering', 'failed')"
+    )
+    op.execute("UPDATE content SET audio_render_status = 'ready' WHERE audio_status = 'ready' AND audio_render_status IS NULL")
+
+
+def downgrade() -> None:
+    op.execute(
+        "UPDATE content SET audio_status = audio_render_status "
+        "WHERE audio_render_status IN ('rendering', 'failed')"
+    )
+    op.drop_column('content', 'audio_render_status')
@@ -2,10 +2,21 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime
 import asyncio
+import uuid
 from ...api.deps.auth import get_current_admin, require_super_admin
+from ...core.config import settings
 from ...db.session import get_db_session
 from ...services.redis_service import get_redis
+from ...services.model_registry import model_registry
+from ...services.lang_detect_service import get_lang_detect_service, spacy_registry
+from ...services.vad_service import vad
+from ...services.transcription_cache import stt_cache
+from ...services.speaker_cache import reference_cache
+from ...services.tts_service import get_tts_service
 from ...models.admin import Admin
+from ...tasks.celery_app import celery_app
+from ...tasks.nlu import rescore_command_log as rescore_command_log_task
+from celery.result import AsyncResult
 
 
 router = APIRouter(prefix="/api/admin/system", tags=["admin-system"]) 
@@ -122,6 +133,71 @@ async def get_system_status(
     }
 
 
+@router.get("/models")
+async def get_loaded_models(
+    current_admin: Admin = Depends(get_current_admin),
+) -> dict:
+    """Get models resident in this worker and their memory usage"""
+    models = model_registry.stats()
+    return {
+        "models": models,
+        "total_memory_mb": round(model_registry.total_memory() / (1024 * 1024), 1),
+        "memory_budget_mb": settings.model_memory_budget_mb,
+        "spacy": spacy_registry.stats(),
+        "spacy_memory_mb": round(spacy_registry.total_memory() / (1024 * 1024), 1),
+        "spacy_memory_budget_mb": settings.spacy_memory_budget_mb,
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@router.get("/vad")
+async def get_vad_stats(
+    current_admin: Admin = Depends(get_current_admin),
+) -> dict:
+    """Get how much audio voice activity detection skipped in this worker"""
+    return {**vad.stats(), "timestamp": datetime.now().isoformat()}
+
+
+@router.get("/ner")
+async def get_ner_stats(
+    current_admin: Admin = Depends(get_current_admin),
+) -> dict:
+    """Get per-language NER batch sizes and queue times for this worker"""
+    return {"languages": get_lang_detect_service().ner_stats(), "timestamp": datetime.now().isoformat()}
+
+
+@router.get("/lang-detect")
+async def get_lang_detect_stats(
+    current_admin: Admin = Depends(get_current_admin),
+) -> dict:
+    """Get text language detection cache hit rate for this worker"""
+    return {**get_lang_detect_service().cache_stats(), "timestamp": datetime.now().isoformat()}
+
+
+@router.get("/stt-cache")
+async def get_stt_cache_stats(
+    current_admin: Admin = Depends(get_current_admin),
+) -> dict:
+    """Get transcription cache hit and miss counts for this worker"""
+    return {**stt_cache.stats(), "timestamp": datetime.now().isoformat()}
+
+
+@router.get("/speaker-cache")
+async def get_speaker_cache_stats(
+    current_admin: Admin = Depends(get_current_admin),
+) -> dict:
+    """Get speaker reference cache hit rate and invalidations for this worker"""
+    return {**reference_cache.stats(), "timestamp": datetime.now().isoformat()}
+
+
+@router.get("/tts-cache")
+async def get_tts_cache_stats(
+    current_admin: Admin = Depends(get_current_admin),
+) -> dict:
+    """Get speech synthesis cache size, quota and hit rate for this worker"""
+    return {**get_tts_service().stats(), "timestamp": datetime.now().isoformat()}
+
+
 @router.get("/logs")
 async def get_system_logs(
     log_type: str = "audit",
@@ -145,6 +221,42 @@ async def get_system_logs(
     }
 
 
+@router.post("/nlu/rescore")
+async def rescore_command_log(
+    workspace_id: str | None = None,
+    limit: int | None = None,
+    current_admin: Admin = Depends(get_current_admin),
+) -> dict:
+    """Queue a batch re-scoring of the command log against the current intent vocabulary"""
+    if workspace_id:
+        try:
+            uuid.UUID(workspace_id)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="workspace_id must be a UUID",
+            )
+    task = rescore_command_log_task.delay(workspace_id, limit)
+    await redis_client.lpush("admin_audit_log",
+        f"Command log re-scoring queued ({workspace_id or 'default vocabulary'}) by: {current_admin.username}")
+    return {"task_id": task.id, "status": "queued"}
+
+
+@router.get("/nlu/rescore/{task_id}")
+async def get_rescore_status(
+    task_id: str,
+    current_admin: Admin = Depends(get_current_admin),
+) -> dict:
+    """Get the state (and summary, once finished) of a re-scoring task"""
+    result = AsyncResult(task_id, app=celery_app)
+    return {
+        "task_id": task_id,
+        "status": result.state.lower(),
+        "result": result.result if result.successful() else None,
+        "error": str(result.result) if result.failed() else None,
+    }
+
+
 @router.post("/clear-logs")
 async def clear_system_logs(
     log_type: str = "audit",
@@ -1,4 +1,6 @@
+import os
 from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
 from pydantic import BaseModel, Field
 from ...services.cloudinary_service import CloudinaryService
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -7,6 +9,7 @@ from ...db.session import get_db_session
 from ...models.content import Content, ContentStatus
 from ...models.user import User, UserRole
 from ...api.deps.auth import require_roles
+from ...tasks.content_audio import render_content_audio
 
 
 router = APIRouter(prefix="/api/content", tags=["content"]) 
@@ -89,6 +92,8 @@ async def get_content(
         "body": row.body,
         "status": row.status.value,
         "lang": row.lang,
+        "audio_status": row.audio_status,
+        "audio_render_status": row.audio_render_status,
     }
 
 
@@ -117,6 +122,8 @@ async def update_content(
         row.lang = body.lang
     await db.commit()
     await db.refresh(row)
+    if row.status == ContentStatus.published and (body.body is not None or body.lang is not None):
+        render_content_audio.delay(str(row.id))
     return {"id": str(row.id), "title": row.title, "body": row.body, "status": row.status.value}
 
 
@@ -131,9 +138,31 @@ async def publish_content(
         raise HTTPException(404, detail="Not found")
     row.status = ContentStatus.published
     await db.commit()
+    render_content_audio.delay(str(row.id))
     return {"id": str(row.id), "status": row.status.value}
 
 
+@router.get("/{content_id}/audio")
+async def get_content_audio(
+    content_id: str,
+    db: AsyncSession = Depends(get_db_session),
+    user: User = Depends(require_roles(UserRole.creator, UserRole.editor, UserRole.admin)),
+) -> FileResponse:
+    """Serve the pre-rendered body audio; no synthesis happens on this path.
+
+    While a newer render is in progress (or after it failed) the last ready
+    artifact is served; X-Audio-Render-Status reports the latest render.
+    """
+    row = (await db.execute(select(Content).where(Content.id == content_id))).scalar_one_or_none()
+    if not row:
+        raise HTTPException(404, detail="Not found")
+    if row.audio_status != "ready" or not row.audio_path or not os.path.exists(row.audio_path):
+        raise HTTPException(409, detail=f"Audio not ready ({row.audio_render_status or 'not rendered'})")
+    media_type = "audio/wav" if row.audio_path.endswith(".wav") else "audio/mpeg"
+    headers = {"X-Audio-Render-Status": row.audio_render_status or "ready"}
+    return FileResponse(row.audio_path, media_type=media_type, headers=headers)
+
+
 @router.post("/{content_id}/archive")
 async def archive_content(
     content_id: str,
@@ -1,36 +1,82 @@
+import asyncio
 from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
-from ...api.deps.auth import get_current_user
-from ...db.session import get_db_session
-from ...models.user import User
-from ...models.voice_profile import VoiceProfile
-from ...services.speaker_id_service import SpeakerIdService
-from typing import Optional
+from sqlalchemy import func, select, update
+from ...api.deps.auth import get_current_user, require_roles
+from ...db.session import AsyncSessionLocal, get_db_session
+from ...models.user import User, UserRole
+from ...models.voice_profile import VoiceProfile, embedding_fingerprint, unpack_embedding
+from ...services.speaker_id_service import SpeakerIdService, get_speaker_service
+from ...services.speaker_cache import get_reference, reference_cache
+from ...services.speaker_index import SpeakerIndex, normalize, snapshot_path, speaker_index
 
 
 router = APIRouter(prefix="/api/voice/speaker", tags=["speaker"]) 
 
-# Lazy-init the heavy model to avoid startup failures (e.g., symlink issues on Windows)
-_svc: Optional[SpeakerIdService] = None
-
 
 def get_svc() -> SpeakerIdService:
-    global _svc
-    if _svc is None:
-        try:
-            _svc = SpeakerIdService()
-        except OSError as e:
-            # Provide a clearer error for common Windows symlink permission issues
-            raise HTTPException(
-                status_code=503,
-                detail=(
-                    "Speaker identification model failed to initialize. "
-                    "On Windows, enable Developer Mode or run as Administrator to allow symlinks, "
-                    "or disable the speaker-id feature. Original error: " + str(e)
-                ),
+    # Lazy-init the heavy model to avoid startup failures (e.g., symlink issues on Windows)
+    try:
+        return get_speaker_service()
+    except OSError as e:
+        # Provide a clearer error for common Windows symlink permission issues
+        raise HTTPException(
+            status_code=503,
+            detail=(
+                "Speaker identification model failed to initialize. "
+                "On Windows, enable Developer Mode or run as Administrator to allow symlinks, "
+                "or disable the speaker-id feature. Original error: " + str(e)
+            ),
+        )
+
+
+_index_lock = asyncio.Lock()
+
+
+async def get_index(db: AsyncSession) -> SpeakerIndex:
+    """Load the identification index once per worker, from the snapshot when it is current"""
+    if speaker_index.loaded:
+        return speaker_index
+    async with _index_lock:
+        if speaker_index.loaded:
+            return speaker_index
+        path = snapshot_path()
+        if path and await asyncio.to_thread(speaker_index.load, path):
+            # Same rows the rebuild reads; hashing in the database keeps the check small
+            current = await db.execute(
+                select(VoiceProfile.user_id, func.md5(VoiceProfile.embedding), VoiceProfile.threshold)
+                .where(VoiceProfile.embedding.is_not(None))
             )
-    return _svc
+            if speaker_index.matches(current):
+                return speaker_index
+        rows = await db.execute(
+            select(VoiceProfile.user_id, VoiceProfile.embedding, VoiceProfile.threshold)
+            .where(VoiceProfile.embedding.is_not(None))
+        )
+        speaker_index.build(
+            (user_id, unpack_embedding(blob), threshold, embedding_fingerprint(blob))
+            for user_id, blob, threshold in rows
+        )
+        if path:
+            await asyncio.to_thread(speaker_index.save, path)
+    return speaker_index
+
+
+async def on_profile_change(user_id: str) -> None:
+    """Apply an enroll from any worker to this worker's identification index"""
+    if not speaker_index.loaded:
+        return
+    async with AsyncSessionLocal() as db:
+        row = (await db.execute(
+            select(VoiceProfile.embedding, VoiceProfile.threshold).where(VoiceProfile.user_id == user_id)
+        )).first()
+    if row is None or row.embedding is None:
+        speaker_index.remove(user_id)
+    else:
+        speaker_index.add(user_id, unpack_embedding(row.embedding), row.threshold, embedding_fingerprint(row.embedding))
+
+
+reference_cache.on_change(on_profile_change)
 
 
 @router.get("/profile")
@@ -51,27 +97,31 @@ async def enroll(
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db_session),
 ) -> dict:
-    import hashlib, os
-    os.makedirs('.cache', exist_ok=True)
-    paths = []
-    for i, s in enumerate([sample1, sample2, sample3], start=1):
-        p = f".cache/enroll_{user.id}_{i}_{s.filename}"
-        with open(p, 'wb') as f:
-            f.write(await s.read())
-        paths.append(p)
+    import hashlib
+    samples = [await s.read() for s in (sample1, sample2, sample3)]
     svc = get_svc()
-    emb = await svc.average_embeddings(paths)
+    try:
+        emb = await svc.average_embeddings(samples)
+    except ValueError as e:
+        raise HTTPException(400, detail=str(e))
     pass_hash = hashlib.sha256(passphrase.encode()).hexdigest()
 
     result = await db.execute(select(VoiceProfile).where(VoiceProfile.user_id == user.id))
     vp = result.scalar_one_or_none()
     if vp:
-        vp.embeddings = {"vector": emb}
+        vp.vector = emb
         vp.passphrase_hash = pass_hash
     else:
-        vp = VoiceProfile(user_id=user.id, embeddings={"vector": emb}, passphrase_hash=pass_hash)
+        vp = VoiceProfile(user_id=user.id, passphrase_hash=pass_hash)
+        vp.vector = emb
         db.add(vp)
     await db.commit()
+    reference_cache.ensure_listener()
+    await reference_cache.publish_change(str(user.id))
+    if speaker_index.loaded:
+        speaker_index.add(user.id, emb, vp.threshold, embedding_fingerprint(vp.embedding))
+        if snapshot_path():
+            await asyncio.to_thread(speaker_index.save, snapshot_path())
     return {"status": "enrolled"}
 
 
@@ -83,18 +133,37 @@ async def verify(
     db: AsyncSession = Depends(get_db_session),
 ) -> dict:
     import hashlib
-    data = await db.execute(select(VoiceProfile).where(VoiceProfile.user_id == user.id))
-    vp = data.scalar_one_or_none()
-    if not vp:
+    ref = await get_reference(user.id, db)
+    if ref is None:
         raise HTTPException(404, detail="No enrollment")
-    p = f".cache/verify_{user.id}_{sample.filename}"
-    with open(p, 'wb') as f:
-        f.write(await sample.read())
     svc = get_svc()
-    probe = await svc.embed_file(p)
-    ref = vp.embeddings.get("vector")
-    score = svc.cosine_similarity(ref, probe)
-    ok_pass = hashlib.sha256(passphrase.encode()).hexdigest() == vp.passphrase_hash
-    return {"match": score >= vp.threshold and ok_pass, "score": score}
+    try:
+        probe = await svc.embed_bytes(await sample.read())
+    except ValueError as e:
+        raise HTTPException(400, detail=str(e))
+    score = float(ref.vector @ normalize(probe))
+    ok_pass = hashlib.sha256(passphrase.encode()).hexdigest() == ref.passphrase_hash
+    return {"match": score >= ref.threshold and ok_pass, "score": score}
+
 
+@router.post("/identify")
+async def identify(
+    sample: UploadFile = File(...),
+    top_k: int = Form(5),
+    user: User = Depends(require_roles(UserRole.admin)),
+    db: AsyncSession = Depends(get_db_session),
+) -> dict:
+    """Rank enrolled speakers by similarity to the sample (1:N identification).
 
+    Admins only: the result names other users and scores their voices.
+    """
+    reference_cache.ensure_listener()
+    index = await get_index(db)
+    svc = get_svc()
+    try:
+        probe = await svc.embed_bytes(await sample.read())
+    except ValueError as e:
+        raise HTTPException(400, detail=str(e))
+    candidates = index.search(probe, k=max(1, min(top_k, 50)))
+    best = candidates[0] if candidates and candidates[0]["match"] else None
+    return {"user_id": best["user_id"] if best else None, "candidates": candidates}
@@ -2,57 +2,137 @@ from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 import json
 import base64
 import asyncio
-from typing import Dict, Any
-from collections import deque
+import logging
+import time
+from typing import Dict, Optional
 from ...services.nlu_service import NLUService
-from ...services.stt_whisper_service import WhisperSTTService
+from ...services.stt_whisper_service import get_stt_service
+from ...services.streaming_stt_service import StreamingTranscriber
+from ...services.streaming_speaker_service import StreamingSpeakerVerifier
+from ...services.speaker_id_service import get_speaker_service
+from ...services.tts_service import get_tts_service
 from ...services.redis_service import get_redis
+from ...services.pubsub_fanout import RedisFanout
+from ...core.config import settings
+from ...tasks.transcription import job_events_channel
 
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/ws", tags=["ws"]) 
 nlu = NLUService()
-stt = WhisperSTTService(model_name="base")
+stt = get_stt_service("base")
+tts = get_tts_service()
 redis_client = get_redis()
+# One subscription per worker delivers job events to every local voice socket
+job_events = RedisFanout(job_events_channel("*"))
 
-# Store active connections and audio buffers
-connections: Dict[str, Any] = {}
+# Active streaming transcription sessions keyed by user id
+connections: Dict[str, StreamingTranscriber] = {}
+verifiers: Dict[str, StreamingSpeakerVerifier] = {}
+# Speaker model load, run off the event loop and retried after a failure
+SPEAKER_RETRY_SECONDS = 30.0
+_speaker_load: Optional[asyncio.Task] = None
+_speaker_retry_at = 0.0
 
 
-async def process_audio_chunk(ws: WebSocket, user_id: str, audio_data: bytes) -> None:
-    """Process audio chunk and send partial results"""
-    if user_id not in connections:
-        connections[user_id] = {"buffer": deque(maxlen=50), "partial_text": ""}
-    
-    connections[user_id]["buffer"].append(audio_data)
-    
-    # When buffer has enough data, process with Whisper
-    if len(connections[user_id]["buffer"]) >= 10:
-        try:
-            # Combine chunks and save to temp file
-            import tempfile
-            import wave
-            import numpy as np
-            
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp:
-                # Convert base64 to PCM and write WAV
-                pcm_data = base64.b64decode(audio_data)
-                with wave.open(tmp.name, 'wb') as wav:
-                    wav.setnchannels(1)
-                    wav.setsampwidth(2)
-                    wav.setframerate(16000)
-                    wav.writeframes(pcm_data)
-                
-                # Transcribe with Whisper
-                text = await stt.transcribe_file(tmp.name)
-                if text and text != connections[user_id]["partial_text"]:
-                    connections[user_id]["partial_text"] = text
-                    await ws.send_text(json.dumps({
-                        "type": "stt_partial",
-                        "text": text,
-                        "confidence": 0.8
-                    }))
-        except Exception as e:
-            print(f"Audio processing error: {e}")
+def _speaker_loaded(task: asyncio.Task) -> None:
+    global _speaker_retry_at
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Continuous speaker verification unavailable, retrying in %.0fs: %s",
+                       SPEAKER_RETRY_SECONDS, task.exception())
+        _speaker_retry_at = time.monotonic() + SPEAKER_RETRY_SECONDS
+
+
+def get_speaker_verifier(user_id: str) -> Optional[StreamingSpeakerVerifier]:
+    """Per-session verifier, or None while the speaker model is loading or unavailable"""
+    global _speaker_load
+    if not settings.speaker_stream_enabled:
+        return None
+    if user_id in verifiers:
+        return verifiers[user_id]
+    failed = _speaker_load is not None and _speaker_load.done() and (
+        _speaker_load.cancelled() or _speaker_load.exception() is not None
+    )
+    if _speaker_load is None or (failed and time.monotonic() >= _speaker_retry_at):
+        _speaker_load = asyncio.create_task(asyncio.to_thread(get_speaker_service))
+        _speaker_load.add_done_callback(_speaker_loaded)
+        return None
+    if failed or not _speaker_load.done():
+        return None
+    verifiers[user_id] = StreamingSpeakerVerifier(_speaker_load.result(), user_id)
+    return verifiers[user_id]
+
+
+async def detect_command(user_id: str, workspace_id: Optional[str], text: str) -> dict:
+    """Run intent detection on a finished utterance and log it for analytics"""
+    matcher = await nlu.matcher_for(workspace_id)
+    intent = nlu.detect_intent(text, matcher)
+    await redis_client.lpush("command_log", json.dumps({
+        "user_id": user_id,
+        "workspace_id": workspace_id,
+        "text": text,
+        "intent": intent,
+        "timestamp": asyncio.get_event_loop().time()
+    }))
+    return intent
+
+
+async def send_transcript_events(ws: WebSocket, user_id: str, workspace_id: Optional[str], events: list) -> None:
+    for event in events:
+        if event["type"] == "stt_final":
+            # A finished utterance is a command, like a client-sent "final"
+            event["nlu"] = await detect_command(user_id, workspace_id, event["text"])
+        await ws.send_text(json.dumps(event))
+
+
+async def process_audio_chunk(
+    ws: WebSocket, user_id: str, pcm: bytes, language: str = None, workspace_id: str = None
+) -> None:
+    """Feed 16 kHz mono PCM into the user's streaming transcriber and send results"""
+    session = connections.get(user_id)
+    if session is None:
+        session = connections[user_id] = StreamingTranscriber(stt, language=language)
+
+    try:
+        await send_transcript_events(ws, user_id, workspace_id, await session.feed(pcm))
+        verifier = get_speaker_verifier(user_id)
+        if verifier is not None:
+            verifier.poll(session, lambda event: ws.send_text(json.dumps(event)))
+    except Exception as e:
+        logger.warning("Audio processing error: %s", e)
+
+
+async def flush_audio(ws: WebSocket, user_id: str, workspace_id: str = None) -> None:
+    """Finalize whatever audio is still buffered for the user"""
+    session = connections.get(user_id)
+    if session is None:
+        return
+    try:
+        await send_transcript_events(ws, user_id, workspace_id, await session.flush())
+    except Exception as e:
+        logger.warning("Audio processing error: %s", e)
+
+
+async def stream_speech(ws: WebSocket, text: str, lang: str) -> None:
+    """Send synthesized speech as base64 MP3 or WAV chunks (per backend), one per sentence"""
+    index = 0
+    try:
+        audio_format = tts.backend_for(lang).audio_format
+        async for chunk in tts.stream(text, lang):
+            await ws.send_text(json.dumps({
+                "type": "tts_chunk",
+                "index": index,
+                "format": audio_format,
+                "data": base64.b64encode(chunk).decode(),
+            }))
+            index += 1
+        await ws.send_text(json.dumps({"type": "tts_end", "chunks": index}))
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.warning("TTS streaming error: %s", e)
+        await ws.send_text(json.dumps({"type": "error", "message": "speech synthesis failed"}))
 
 
 async def broadcast_presence(user_id: str, action: str, workspace_id: str = None) -> None:
@@ -67,14 +147,29 @@ async def broadcast_presence(user_id: str, action: str, workspace_id: str = None
     await redis_client.publish("presence", json.dumps(message))
 
 
+async def forward_job_events(ws: WebSocket, user_id: str) -> None:
+    """Push background transcription job results to the user's voice socket"""
+    channel = job_events_channel(user_id)
+    queue = job_events.subscribe(channel)
+    try:
+        while True:
+            await ws.send_text(await queue.get())
+    except Exception as e:
+        logger.warning("Job event forwarding error: %s", e)
+    finally:
+        job_events.unsubscribe(channel, queue)
+
+
 @router.websocket("/voice")
-async def voice_socket(ws: WebSocket, user_id: str = None) -> None:
+async def voice_socket(ws: WebSocket, user_id: str = None, language: str = None, workspace_id: str = None) -> None:
     await ws.accept()
     if not user_id:
         await ws.close(code=4001, reason="User ID required")
         return
     
     await broadcast_presence(user_id, "connected")
+    job_events = asyncio.create_task(forward_job_events(ws, user_id))
+    speech: Optional[asyncio.Task] = None
     
     try:
         await ws.send_text(json.dumps({"type": "hello", "message": "connected"}))
@@ -85,9 +180,8 @@ async def voice_socket(ws: WebSocket, user_id: str = None) -> None:
                 if "text" in message:
                     raw = message["text"]
                 elif "bytes" in message:
-                    # Handle binary audio data
-                    audio_data = message["bytes"]
-                    await process_audio_chunk(ws, user_id, audio_data)
+                    # Binary frames carry raw 16-bit PCM
+                    await process_audio_chunk(ws, user_id, message["bytes"], language, workspace_id)
                     continue
                 else:
                     continue
@@ -102,19 +196,26 @@ async def voice_socket(ws: WebSocket, user_id: str = None) -> None:
 
             if msg.get("type") == "audio_frame":
                 # Handle base64 encoded audio frame
-                audio_data = msg.get("data", "")
-                await process_audio_chunk(ws, user_id, audio_data.encode())
+                try:
+                    pcm = base64.b64decode(msg.get("data", ""))
+                except Exception:
+                    await ws.send_text(json.dumps({"type": "error", "message": "invalid audio frame"}))
+                    continue
+                await process_audio_chunk(ws, user_id, pcm, language, workspace_id)
+            elif msg.get("type") == "audio_end":
+                await flush_audio(ws, user_id, workspace_id)
+            elif msg.get("type") == "tts_request":
+                text = (msg.get("text") or "").strip()
+                if not text:
+                    await ws.send_text(json.dumps({"type": "error", "message": "text required"}))
+                    continue
+                # A new request interrupts speech that is still streaming
+                if speech is not None:
+                    speech.cancel()
+                speech = asyncio.create_task(stream_speech(ws, text, msg.get("lang") or "en"))
             elif msg.get("type") == "final":
                 text = msg.get("text", "")
-                intent = nlu.detect_intent(text)
-                
-                # Log command for analytics
-                await redis_client.lpush("command_log", json.dumps({
-                    "user_id": user_id,
-                    "text": text,
-                    "intent": intent,
-                    "timestamp": asyncio.get_event_loop().time()
-                }))
+                intent = await detect_command(user_id, msg.get("workspace_id") or workspace_id, text)
                 
                 await ws.send_text(json.dumps({
                     "type": "stt_final",
@@ -124,12 +225,19 @@ async def voice_socket(ws: WebSocket, user_id: str = None) -> None:
             else:
                 await ws.send_text(json.dumps({"type": "noop"}))
     except WebSocketDisconnect:
-        if user_id in connections:
-            del connections[user_id]
         await broadcast_presence(user_id, "disconnected")
     except Exception as e:
         print(f"WebSocket error: {e}")
         await ws.close()
+    finally:
+        # Runs on every exit path, so no session state or task outlives the socket
+        connections.pop(user_id, None)
+        verifier = verifiers.pop(user_id, None)
+        if verifier is not None:
+            verifier.close()
+        job_events.cancel()
+        if speech is not None:
+            speech.cancel()
 
 
 @router.websocket("/collab/{workspace_id}")
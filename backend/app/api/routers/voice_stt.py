@@ -1,16 +1,31 @@
-from fastapi import APIRouter, UploadFile, File, Form
+import asyncio
+import json
+import time
+import uuid
+from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException
 from pydantic import BaseModel
 
-from ...services.stt_whisper_service import WhisperSTTService
-from pathlib import Path
+from ...api.deps.auth import get_current_user
+from ...core.config import settings
+from ...models.user import User
+from ...services.audio_io import decode_audio_bytes
+from ...services.redis_service import get_redis
+from ...services.stt_whisper_service import get_stt_service, route_by_language
+from ...services.transcription_cache import stt_cache
+from ...tasks.transcription import (
+    JOB_TTL_SECONDS,
+    job_audio_key,
+    job_key,
+    job_segments_key,
+    transcribe_job,
+)
 
 
 router = APIRouter(prefix="/api/voice", tags=["voice"]) 
 
 
-stt_service = WhisperSTTService(model_name="base")
-UPLOAD_DIR = Path('.cache')
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+stt_service = get_stt_service("base")
+redis_client = get_redis()
 
 
 @router.post("/stt")
@@ -19,11 +34,64 @@ async def stt_endpoint(
     language: str | None = Form(default=None),
 ) -> dict:
     contents = await audio.read()
-    tmp_path = UPLOAD_DIR / f"upload_{audio.filename}"
-    with open(tmp_path, "wb") as f:
-        f.write(contents)
+    pcm = await asyncio.to_thread(decode_audio_bytes, contents)
+    cache_key = await asyncio.to_thread(stt_cache.key, pcm, stt_service.model_name, language)
+    result = await stt_cache.get(cache_key)
+    cached = result is not None
+    if not cached:
+        # Keyed on the request, so a hit also skips language detection
+        service, routed = await route_by_language(pcm, language, stt_service.model_name)
+        result = await service.transcribe_detailed(pcm, language=routed)
+        result["language"] = routed or result["language"]
+        await stt_cache.set(cache_key, result)
+    return {"text": result["text"], "language": result.get("language", language), "vad": result["vad"], "cached": cached}
 
-    text = await stt_service.transcribe_file(str(tmp_path), language=language)
-    return {"text": text, "language": language}
 
+@router.post("/stt/jobs")
+async def create_stt_job(
+    audio: UploadFile = File(...),
+    language: str | None = Form(default=None),
+    user: User = Depends(get_current_user),
+) -> dict:
+    """Queue a long recording for background transcription"""
+    max_bytes = settings.stt_job_max_upload_mb * 1024 * 1024
+    # Read one byte past the limit so oversized uploads are rejected without buffering them whole
+    contents = await audio.read(max_bytes + 1)
+    if len(contents) > max_bytes:
+        raise HTTPException(status_code=413, detail=f"Audio exceeds {settings.stt_job_max_upload_mb} MB")
+    job_id = uuid.uuid4().hex
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.set(job_audio_key(job_id), contents, ex=JOB_TTL_SECONDS)
+        pipe.hset(job_key(job_id), mapping={
+            "status": "queued",
+            "progress": 0,
+            "user_id": str(user.id),
+            "language": language or "",
+            "created_at": time.time(),
+        })
+        pipe.expire(job_key(job_id), JOB_TTL_SECONDS)
+        await pipe.execute()
+    transcribe_job.delay(job_id, stt_service.model_name, language)
+    return {"job_id": job_id, "status": "queued"}
 
+
+@router.get("/stt/jobs/{job_id}")
+async def get_stt_job(
+    job_id: str,
+    offset: int = 0,
+    user: User = Depends(get_current_user),
+) -> dict:
+    """Get job progress and the segments transcribed so far (from `offset`)"""
+    state = await redis_client.hgetall(job_key(job_id))
+    if not state or state.get("user_id") != str(user.id):
+        raise HTTPException(404, detail="Job not found")
+    segments = await redis_client.lrange(job_segments_key(job_id), offset, -1)
+    return {
+        "job_id": job_id,
+        "status": state.get("status"),
+        "progress": float(state.get("progress", 0)),
+        "text": state.get("text"),
+        "error": state.get("error"),
+        # Chunks finish out of order; present them on the timeline
+        "segments": sorted((json.loads(s) for s in segments), key=lambda seg: seg["start"]),
+    }
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
-from ...services.tts_service import TTSService
+from ...services.tts_service import get_tts_service
 from ...api.deps.auth import get_current_user
 
 
@@ -13,7 +14,7 @@ class TTSRequest(BaseModel):
     lang: str = Field(default="en")
 
 
-tts_service = TTSService()
+tts_service = get_tts_service()
 
 
 @router.post("/tts")
@@ -22,3 +23,8 @@ async def tts_endpoint(body: TTSRequest, user=Depends(get_current_user)) -> dict
     return {"file_path": file_path}
 
 
+@router.post("/tts/stream")
+async def tts_stream_endpoint(body: TTSRequest, user=Depends(get_current_user)) -> StreamingResponse:
+    """Chunked MP3 or WAV (per backend), one chunk per sentence as soon as it is synthesized"""
+    media_type = tts_service.backend_for(body.lang).media_type
+    return StreamingResponse(tts_service.stream(body.text, body.lang), media_type=media_type)
@@ -22,6 +22,78 @@ class Settings(BaseSettings):
     # Admin configuration
     ADMIN_SECURITY_CODE: str = "ADMIN_SECURE_2024"
 
+    # Streaming speech-to-text
+    STT_STREAM_STEP_SECONDS: float = 1.0
+    STT_STREAM_MAX_WINDOW_SECONDS: float = 15.0
+    STT_BATCH_MAX_SIZE: int = 8
+    STT_BATCH_MAX_LATENCY_MS: float = 30.0
+    # Speaker embedding micro-batching (verify, identify, streaming checks)
+    SPEAKER_BATCH_MAX_SIZE: int = 16
+    SPEAKER_BATCH_MAX_LATENCY_MS: float = 20.0
+    # Largest recording accepted by /api/voice/stt/jobs (held in Redis until transcribed)
+    STT_JOB_MAX_UPLOAD_MB: int = 100
+
+    # Shared model registry; a budget of 0 disables eviction
+    MODEL_MEMORY_BUDGET_MB: int = 0
+    MODEL_IDLE_SECONDS: float = 300.0
+
+    # Inference backend: "thread" runs in the API process, "process" in a worker pool
+    INFERENCE_BACKEND: str = "thread"
+    INFERENCE_WORKERS: int = 0
+    INFERENCE_THREADS_PER_WORKER: int = 2
+    # Models loaded (and warmed up) at startup, in every inference worker too
+    INFERENCE_PRELOAD: str = "whisper:base,speaker:speechbrain/spkrec-ecapa-voxceleb"
+    WARMUP_ON_STARTUP: bool = True
+    # Preloads /ready waits for: kinds ("whisper") or entries ("speaker:<source>"); empty = all
+    READY_REQUIRES: str = "whisper"
+    WARMUP_RETRY_INITIAL_SECONDS: float = 5.0
+    WARMUP_RETRY_MAX_SECONDS: float = 300.0
+
+    # Models to run with int8 dynamic quantization, e.g. "whisper:base,speaker:*"
+    QUANTIZE_MODELS: str = ""
+
+    # Transcription cache (in-process LRU + Redis)
+    STT_CACHE_MAX_ENTRIES: int = 1024
+    STT_CACHE_REDIS_MAX_ENTRIES: int = 50000
+    STT_CACHE_TTL_SECONDS: int = 86400
+
+    # Speaker identification index snapshot (.npy); empty disables snapshots
+    SPEAKER_INDEX_SNAPSHOT: str = ""
+    SPEAKER_CACHE_MAX_ENTRIES: int = 10000
+    SPEAKER_CACHE_TTL_SECONDS: float = 600.0
+    # Continuous verification on /ws/voice
+    SPEAKER_STREAM_ENABLED: bool = True
+    SPEAKER_STREAM_INTERVAL_SECONDS: float = 5.0
+    SPEAKER_STREAM_WINDOW_SECONDS: float = 3.0
+
+    # spaCy NER pipelines: loaded on first use, LRU-evicted past the budget (0 = unlimited)
+    SPACY_MEMORY_BUDGET_MB: int = 0
+    SPACY_PRELOAD: str = ""
+    NER_BATCH_MAX_SIZE: int = 32
+    NER_BATCH_MAX_LATENCY_MS: float = 10.0
+
+    # Language detection: texts this long use lingua's faster low-accuracy mode
+    LANG_DETECT_LOW_ACCURACY_MIN_CHARS: int = 120
+    LANG_DETECT_CACHE_SIZE: int = 4096
+    # Route STT to the language's own Whisper model (e.g. base.en), detecting
+    # the language on the first seconds of speech when the client sends none.
+    # Opt-in: add the routed models (whisper:base.en) to INFERENCE_PRELOAD too
+    STT_LANGUAGE_ROUTING: bool = False
+    LANG_DETECT_AUDIO_SECONDS: float = 6.0
+    LANG_DETECT_AUDIO_MIN_CONFIDENCE: float = 0.5
+
+    # Seconds before a workspace's custom intent vocabulary is re-read
+    NLU_VOCAB_TTL_SECONDS: float = 30.0
+
+    # Text-to-speech audio cache
+    TTS_CACHE_MAX_MB: int = 1024
+    TTS_STREAM_CONCURRENCY: int = 4
+    # Backend preference order; piper is used for voices with a model in TTS_PIPER_VOICES_DIR
+    TTS_BACKENDS: str = "piper,gtts"
+    TTS_PIPER_VOICES_DIR: str = ".cache/piper"
+    # Piper syntheses running at once in this process
+    TTS_PIPER_MAX_CONCURRENCY: int = 4
+
 
 settings = Settings()
 
@@ -40,6 +112,48 @@ def _add_lowercase_aliases() -> None:
     setattr(Settings, 'cloudinary_api_key', property(lambda s: s.CLOUDINARY_API_KEY))
     setattr(Settings, 'cloudinary_api_secret', property(lambda s: s.CLOUDINARY_API_SECRET))
     setattr(Settings, 'admin_security_code', property(lambda s: s.ADMIN_SECURITY_CODE))
+    setattr(Settings, 'stt_stream_step_seconds', property(lambda s: s.STT_STREAM_STEP_SECONDS))
+    setattr(Settings, 'stt_stream_max_window_seconds', property(lambda s: s.STT_STREAM_MAX_WINDOW_SECONDS))
+    setattr(Settings, 'stt_batch_max_size', property(lambda s: s.STT_BATCH_MAX_SIZE))
+    setattr(Settings, 'stt_batch_max_latency_ms', property(lambda s: s.STT_BATCH_MAX_LATENCY_MS))
+    setattr(Settings, 'speaker_batch_max_size', property(lambda s: s.SPEAKER_BATCH_MAX_SIZE))
+    setattr(Settings, 'speaker_batch_max_latency_ms', property(lambda s: s.SPEAKER_BATCH_MAX_LATENCY_MS))
+    setattr(Settings, 'stt_job_max_upload_mb', property(lambda s: s.STT_JOB_MAX_UPLOAD_MB))
+    setattr(Settings, 'model_memory_budget_mb', property(lambda s: s.MODEL_MEMORY_BUDGET_MB))
+    setattr(Settings, 'model_idle_seconds', property(lambda s: s.MODEL_IDLE_SECONDS))
+    setattr(Settings, 'inference_backend', property(lambda s: s.INFERENCE_BACKEND))
+    setattr(Settings, 'inference_workers', property(lambda s: s.INFERENCE_WORKERS))
+    setattr(Settings, 'inference_threads_per_worker', property(lambda s: s.INFERENCE_THREADS_PER_WORKER))
+    setattr(Settings, 'inference_preload', property(lambda s: s.INFERENCE_PRELOAD))
+    setattr(Settings, 'warmup_on_startup', property(lambda s: s.WARMUP_ON_STARTUP))
+    setattr(Settings, 'ready_requires', property(lambda s: s.READY_REQUIRES))
+    setattr(Settings, 'warmup_retry_initial_seconds', property(lambda s: s.WARMUP_RETRY_INITIAL_SECONDS))
+    setattr(Settings, 'warmup_retry_max_seconds', property(lambda s: s.WARMUP_RETRY_MAX_SECONDS))
+    setattr(Settings, 'quantize_models', property(lambda s: s.QUANTIZE_MODELS))
+    setattr(Settings, 'stt_cache_max_entries', property(lambda s: s.STT_CACHE_MAX_ENTRIES))
+    setattr(Settings, 'stt_cache_redis_max_entries', property(lambda s: s.STT_CACHE_REDIS_MAX_ENTRIES))
+    setattr(Settings, 'stt_cache_ttl_seconds', property(lambda s: s.STT_CACHE_TTL_SECONDS))
+    setattr(Settings, 'speaker_index_snapshot', property(lambda s: s.SPEAKER_INDEX_SNAPSHOT))
+    setattr(Settings, 'speaker_cache_max_entries', property(lambda s: s.SPEAKER_CACHE_MAX_ENTRIES))
+    setattr(Settings, 'speaker_cache_ttl_seconds', property(lambda s: s.SPEAKER_CACHE_TTL_SECONDS))
+    setattr(Settings, 'speaker_stream_enabled', property(lambda s: s.SPEAKER_STREAM_ENABLED))
+    setattr(Settings, 'speaker_stream_interval_seconds', property(lambda s: s.SPEAKER_STREAM_INTERVAL_SECONDS))
+    setattr(Settings, 'speaker_stream_window_seconds', property(lambda s: s.SPEAKER_STREAM_WINDOW_SECONDS))
+    setattr(Settings, 'spacy_memory_budget_mb', property(lambda s: s.SPACY_MEMORY_BUDGET_MB))
+    setattr(Settings, 'spacy_preload', property(lambda s: s.SPACY_PRELOAD))
+    setattr(Settings, 'ner_batch_max_size', property(lambda s: s.NER_BATCH_MAX_SIZE))
+    setattr(Settings, 'ner_batch_max_latency_ms', property(lambda s: s.NER_BATCH_MAX_LATENCY_MS))
+    setattr(Settings, 'lang_detect_low_accuracy_min_chars', property(lambda s: s.LANG_DETECT_LOW_ACCURACY_MIN_CHARS))
+    setattr(Settings, 'lang_detect_cache_size', property(lambda s: s.LANG_DETECT_CACHE_SIZE))
+    setattr(Settings, 'stt_language_routing', property(lambda s: s.STT_LANGUAGE_ROUTING))
+    setattr(Settings, 'lang_detect_audio_seconds', property(lambda s: s.LANG_DETECT_AUDIO_SECONDS))
+    setattr(Settings, 'lang_detect_audio_min_confidence', property(lambda s: s.LANG_DETECT_AUDIO_MIN_CONFIDENCE))
+    setattr(Settings, 'nlu_vocab_ttl_seconds', property(lambda s: s.NLU_VOCAB_TTL_SECONDS))
+    setattr(Settings, 'tts_cache_max_mb', property(lambda s: s.TTS_CACHE_MAX_MB))
+    setattr(Settings, 'tts_stream_concurrency', property(lambda s: s.TTS_STREAM_CONCURRENCY))
+    setattr(Settings, 'tts_backends', property(lambda s: s.TTS_BACKENDS))
+    setattr(Settings, 'tts_piper_voices_dir', property(lambda s: s.TTS_PIPER_VOICES_DIR))
+    setattr(Settings, 'tts_piper_max_concurrency', property(lambda s: s.TTS_PIPER_MAX_CONCURRENCY))
 
 
 _add_lowercase_aliases()
@@ -1,11 +1,30 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from .core.config import settings
 from .api.routers import api_router
 from .api.routers.streaming import router as streaming_router
+from .services.inference_pool import get_inference_pool
+from .services.warmup import readiness, warm_up
 
 
-app = FastAPI(title=settings.app_name)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up in the background so /health answers while models load
+    warmup = asyncio.create_task(warm_up()) if settings.warmup_on_startup else None
+    if warmup is None:
+        readiness.ready = True
+    yield
+    if warmup is not None:
+        warmup.cancel()
+    pool = get_inference_pool()
+    if pool is not None:
+        await asyncio.to_thread(pool.shutdown)
+
+
+app = FastAPI(title=settings.app_name, lifespan=lifespan)
 
 # Configure CORS
 origins_raw = settings.backend_cors_origins or ""
@@ -27,6 +46,12 @@ async def health() -> dict:
     return {"status": "ok"}
 
 
+@app.get("/ready")
+async def ready() -> JSONResponse:
+    """Readiness probe: 503 until the preloads named by READY_REQUIRES are warm"""
+    return JSONResponse(readiness.snapshot(), status_code=200 if readiness.ready else 503)
+
+
 app.include_router(api_router)
 app.include_router(streaming_router)
 
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import String, DateTime, ForeignKey, Text, Enum
+from sqlalchemy import String, DateTime, ForeignKey, Text, Enum, JSON
 from sqlalchemy.orm import Mapped, mapped_column
 from ..db.session import Base
 from sqlalchemy.dialects.postgresql import UUID
@@ -23,5 +23,13 @@ class Content(Base):
     lang: Mapped[str] = mapped_column(String(10), default="en")
     created_by: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"))
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
-
-
+    # Pre-rendered body audio, maintained by the content.render_audio task.
+    # audio_status/audio_path describe the artifact being served, which stays
+    # in place until a newer render replaces it; audio_render_status tracks
+    # the latest render (rendering, failed, ready).
+    audio_status: Mapped[str | None] = mapped_column(String(20), nullable=True)
+    audio_render_status: Mapped[str | None] = mapped_column(String(20), nullable=True)
+    audio_path: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    audio_digest: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    audio_manifest: Mapped[list | None] = mapped_column(JSON, nullable=True)
+    audio_rendered_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
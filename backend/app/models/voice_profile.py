@@ -1,11 +1,40 @@
+import hashlib
+import struct
 import uuid
 from datetime import datetime
-from sqlalchemy import DateTime, ForeignKey, JSON, String
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import DateTime, ForeignKey, LargeBinary, String
 from sqlalchemy.orm import Mapped, mapped_column
 from ..db.session import Base
 from sqlalchemy.dialects.postgresql import UUID
 
 
+# Embedding blob: 8-byte header (magic, format version, dimension) + little-endian float32
+EMBEDDING_MAGIC = b"VE"
+EMBEDDING_VERSION = 1
+_HEADER = struct.Struct("<2sHI")
+
+
+def pack_embedding(vector) -> bytes:
+    vec = np.asarray(vector, dtype="<f4").reshape(-1)
+    return _HEADER.pack(EMBEDDING_MAGIC, EMBEDDING_VERSION, vec.shape[0]) + vec.tobytes()
+
+
+def unpack_embedding(blob: bytes) -> np.ndarray:
+    """Read-only float32 view over the blob (no copy)"""
+    magic, version, dim = _HEADER.unpack_from(blob)
+    if magic != EMBEDDING_MAGIC or version != EMBEDDING_VERSION:
+        raise ValueError(f"Unsupported embedding format {magic!r} v{version}")
+    return np.frombuffer(blob, dtype="<f4", count=dim, offset=_HEADER.size)
+
+
+def embedding_fingerprint(blob: bytes) -> str:
+    """Hex MD5 of the stored blob; equal to Postgres md5(embedding), so it can be compared in SQL"""
+    return hashlib.md5(blob, usedforsecurity=False).hexdigest()
+
+
 class VoiceProfile(Base):
     __tablename__ = "voice_profiles"
 
@@ -13,8 +42,14 @@ class VoiceProfile(Base):
     user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"))
     language_pref: Mapped[str] = mapped_column(String(10), default="en")
     passphrase_hash: Mapped[str] = mapped_column(String(255))
-    embeddings: Mapped[dict] = mapped_column(JSON, default=dict)
+    embedding: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
     threshold: Mapped[float] = mapped_column(default=0.75)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
+    @property
+    def vector(self) -> Optional[np.ndarray]:
+        return unpack_embedding(self.embedding) if self.embedding else None
 
+    @vector.setter
+    def vector(self, value) -> None:
+        self.embedding = pack_embedding(value)
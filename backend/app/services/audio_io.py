@@ -0,0 +1,78 @@
+import io
+import os
+import subprocess
+import tempfile
+
+import librosa
+import numpy as np
+import soundfile as sf
+
+
+SAMPLE_RATE = 16000
+
+
+def pcm16_to_float32(data: bytes) -> np.ndarray:
+    """Convert little-endian 16-bit mono PCM to float32 samples in [-1, 1]"""
+    usable = len(data) - (len(data) % 2)
+    if usable <= 0:
+        return np.zeros(0, dtype=np.float32)
+    samples = np.frombuffer(data, dtype="<i2", count=usable // 2)
+    return samples.astype(np.float32) / 32768.0
+
+
+def decode_audio_bytes(data: bytes, sr: int = SAMPLE_RATE) -> np.ndarray:
+    """Decode an encoded audio file held in memory to mono float32 at `sr`.
+
+    WAV/FLAC/OGG/MP3 are decoded in-process by libsndfile. Containers it cannot
+    read (e.g. browser webm recordings) are piped through ffmpeg over
+    stdin/stdout, still without touching disk. MP4/M4A/MOV often keep their
+    index (moov atom) at the end, which ffmpeg cannot reach on a pipe, so
+    those, and anything the pipe fails on, go through a temporary file.
+    """
+    try:
+        audio, native_sr = sf.read(io.BytesIO(data), dtype="float32", always_2d=True)
+    except RuntimeError:
+        return _decode_with_ffmpeg(data, sr)
+
+    audio = audio.mean(axis=1) if audio.shape[1] > 1 else audio[:, 0]
+    if native_sr != sr:
+        audio = librosa.resample(audio, orig_sr=native_sr, target_sr=sr, res_type="soxr_hq")
+    return np.ascontiguousarray(audio, dtype=np.float32)
+
+
+def _is_mp4(data: bytes) -> bool:
+    # ISO base media files (mp4, m4a, mov, 3gp) open with an `ftyp` box
+    return data[4:8] == b"ftyp"
+
+
+def _ffmpeg_command(source: str, sr: int) -> list:
+    return [
+        "ffmpeg", "-nostdin", "-threads", "0",
+        "-i", source,
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sr),
+        "pipe:1",
+    ]
+
+
+def _decode_with_ffmpeg(data: bytes, sr: int) -> np.ndarray:
+    if not _is_mp4(data):
+        try:
+            out = subprocess.run(_ffmpeg_command("pipe:0", sr), input=data, capture_output=True, check=True).stdout
+            return pcm16_to_float32(out)
+        except subprocess.CalledProcessError:
+            pass
+    return _decode_with_ffmpeg_file(data, sr)
+
+
+def _decode_with_ffmpeg_file(data: bytes, sr: int) -> np.ndarray:
+    """Decode from a seekable temporary file, for containers indexed at the end"""
+    fd, path = tempfile.mkstemp(prefix="audio-", suffix=".bin")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        out = subprocess.run(_ffmpeg_command(path, sr), capture_output=True, check=True).stdout
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to decode audio: {e.stderr.decode(errors='ignore')}") from e
+    finally:
+        os.unlink(path)
+    return pcm16_to_float32(out)
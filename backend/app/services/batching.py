@@ -0,0 +1,99 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Generic, List, Optional, Tuple, TypeVar, Union
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """Collects concurrent requests and runs them through `run_batch` together.
+
+    A batch is dispatched once `max_batch_size` requests are queued or the
+    oldest one has waited `max_latency_ms`, whichever comes first. `run_batch`
+    must return one result per item; a plain function runs on a worker thread,
+    a coroutine function is awaited directly. `stats()` reports batch sizes and
+    how long requests waited before their batch was dispatched.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[List[T]], Union[List[R], Awaitable[List[R]]]],
+        max_batch_size: int = 8,
+        max_latency_ms: float = 20.0,
+    ) -> None:
+        self.run_batch = run_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_latency = max_latency_ms / 1000.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+        self._queue_seconds = 0.0
+        self._max_queue_seconds = 0.0
+
+    async def submit(self, item: T) -> R:
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._worker.get_loop() is not loop:
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+        future: asyncio.Future = loop.create_future()
+        self._queue.put_nowait((item, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self) -> List[Tuple[T, asyncio.Future, float]]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_latency
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = [(item, fut, queued) for item, fut, queued in await self._collect() if not fut.done()]
+            if not batch:
+                continue
+            self._record(batch)
+            try:
+                items = [item for item, _, _ in batch]
+                if asyncio.iscoroutinefunction(self.run_batch):
+                    results: List[Any] = await self.run_batch(items)
+                else:
+                    results = await asyncio.to_thread(self.run_batch, items)
+            except Exception as e:
+                for _, fut, _ in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+            for (_, fut, _), result in zip(batch, results):
+                if not fut.done():
+                    fut.set_result(result)
+
+    def _record(self, batch: List[Tuple[T, asyncio.Future, float]]) -> None:
+        now = time.perf_counter()
+        waits = [now - queued for _, _, queued in batch]
+        self.batches += 1
+        self.items += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        self._queue_seconds += sum(waits)
+        self._max_queue_seconds = max(self._max_queue_seconds, max(waits))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "mean_queue_ms": round(1000 * self._queue_seconds / self.items, 2) if self.items else 0.0,
+            "max_queue_ms": round(1000 * self._max_queue_seconds, 2),
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+        }
@@ -0,0 +1,162 @@
+import asyncio
+import multiprocessing as mp
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..core.config import settings
+from .model_registry import parse_model_list
+
+
+def _init_worker(threads: int, preload: List[Tuple[str, str]]) -> None:
+    import torch
+
+    torch.set_num_threads(threads)
+    torch.set_num_interop_threads(1)
+
+    # Importing the services registers their model loaders
+    from . import stt_whisper_service  # noqa: F401
+    from .model_registry import model_registry
+    try:
+        from . import speaker_id_service  # noqa: F401
+    except Exception as e:
+        print(f"Speaker model unavailable in inference worker: {e}")
+
+    # An optional model that fails to load must not break the pool for the rest
+    for kind, name in preload:
+        try:
+            model_registry.get(kind, name)
+        except Exception as e:
+            print(f"Preload of {kind}:{name} failed in inference worker: {e}")
+
+
+def _invoke(fn: Callable[..., Any], shm_name: str, lengths: List[int], args: tuple) -> Any:
+    """Worker entry point: map the shared PCM block and call `fn(arrays, *args)`"""
+    # Spawned workers share the parent's resource tracker, which already tracks
+    # the block; the parent's unlink is the one place it is unregistered
+    shm = SharedMemory(name=shm_name)
+    try:
+        flat = np.ndarray((sum(lengths),), dtype=np.float32, buffer=shm.buf)
+        offsets = np.cumsum([0, *lengths])
+        arrays = [flat[offsets[i]:offsets[i + 1]] for i in range(len(lengths))]
+        result = fn(arrays, *args)
+        del flat, arrays
+        return result
+    finally:
+        try:
+            shm.close()
+        except BufferError:
+            # A tensor still references the mapping; it is released when collected
+            pass
+
+
+class _SharedPCM:
+    """Float32 arrays packed back to back into one shared-memory block"""
+
+    def __init__(self, arrays: Sequence[np.ndarray]) -> None:
+        self.lengths = [len(a) for a in arrays]
+        total = sum(self.lengths)
+        self.shm = SharedMemory(create=True, size=max(total, 1) * 4)
+        flat = np.ndarray((total,), dtype=np.float32, buffer=self.shm.buf)
+        pos = 0
+        for a in arrays:
+            flat[pos:pos + len(a)] = a
+            pos += len(a)
+        del flat
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def release(self) -> None:
+        self.shm.close()
+        self.shm.unlink()
+
+
+class InferencePool:
+    """Process pool that runs inference off the API process.
+
+    Workers are spawned with their models preloaded and torch limited to
+    `threads_per_worker` intra-op threads. Audio travels through shared memory;
+    only small metadata is pickled. If a worker dies the pool is rebuilt and
+    the call retried once.
+    """
+
+    def __init__(self, workers: int, threads_per_worker: int, preload: List[Tuple[str, str]]) -> None:
+        self.threads_per_worker = max(1, threads_per_worker)
+        self.workers = workers or max(1, (os.cpu_count() or 1) // self.threads_per_worker)
+        self.preload = preload
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.restarts = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=mp.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.threads_per_worker, self.preload),
+                )
+            return self._executor
+
+    def _restart(self, broken: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is broken:
+                print("Inference worker crashed; restarting process pool")
+                broken.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+                self.restarts += 1
+
+    async def run(self, fn: Callable[..., Any], arrays: Sequence[np.ndarray], *args: Any) -> Any:
+        """Run `fn(arrays, *args)` in a worker; `fn` must be a module-level function"""
+        block = _SharedPCM(arrays)
+        try:
+            for attempt in range(2):
+                executor = self._get_executor()
+                try:
+                    future = executor.submit(_invoke, fn, block.name, block.lengths, args)
+                    return await asyncio.wrap_future(future)
+                except BrokenProcessPool:
+                    self._restart(executor)
+                    if attempt:
+                        raise
+        finally:
+            block.release()
+
+    def start(self) -> None:
+        """Spawn the workers now instead of on the first call"""
+        executor = self._get_executor()
+        for f in [executor.submit(os.getpid) for _ in range(self.workers)]:
+            f.result()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+
+_pool: Optional[InferencePool] = None
+_pool_lock = threading.Lock()
+
+
+def get_inference_pool() -> Optional[InferencePool]:
+    """Shared pool when INFERENCE_BACKEND=process, otherwise None (use threads)"""
+    global _pool
+    if settings.inference_backend != "process":
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = InferencePool(
+                workers=settings.inference_workers,
+                threads_per_worker=settings.inference_threads_per_worker,
+                preload=parse_model_list(settings.inference_preload),
+            )
+        return _pool
@@ -1,13 +1,48 @@
 import asyncio
-from typing import Dict, Any, Optional
+import copy
+import re
+from functools import lru_cache, partial
+from typing import Dict, Any, List, Optional
 from lingua import Language, LanguageDetectorBuilder
-import spacy
+
+from ..core.config import settings
+from .batching import MicroBatcher
+from .model_registry import ModelRegistry
+
+
+SPACY_MODELS = {
+    "en": "en_core_web_sm",
+    "es": "es_core_news_sm",
+    "fr": "fr_core_news_sm",
+    "de": "de_core_news_sm",
+}
+# Whisper sizes that also ship an English-only variant ("base" -> "base.en")
+ENGLISH_ONLY_WHISPER = {"tiny", "base", "small", "medium"}
+
+_WHITESPACE = re.compile(r"\s+")
+
+# Only NER (and the tok2vec it listens to) is used; excluded components are never loaded
+SPACY_EXCLUDE = ["parser", "lemmatizer", "tagger", "attribute_ruler", "morphologizer", "senter"]
+
+
+def load_spacy_pipeline(name: str):
+    import spacy
+
+    return spacy.load(name, exclude=SPACY_EXCLUDE)
+
+
+# Separate from the torch model registry so NER pipelines have their own budget
+spacy_registry = ModelRegistry(
+    memory_budget_mb=settings.spacy_memory_budget_mb,
+    idle_seconds=settings.model_idle_seconds,
+)
+spacy_registry.register_loader("spacy", load_spacy_pipeline)
 
 
 class LanguageDetectionService:
     def __init__(self) -> None:
-        # Initialize language detector with common languages
-        self.detector = LanguageDetectorBuilder.from_languages(
+        # Initialize language detectors with common languages
+        languages = (
             Language.ENGLISH,
             Language.SPANISH,
             Language.FRENCH,
@@ -18,42 +53,77 @@ class LanguageDetectionService:
             Language.CHINESE,
             Language.JAPANESE,
             Language.KOREAN,
-        ).build()
-        
-        # Load spaCy models for supported languages
-        self.nlp_models = {
-            "en": spacy.load("en_core_web_sm"),
-            "es": spacy.load("es_core_news_sm"),
-            "fr": spacy.load("fr_core_news_sm"),
-            "de": spacy.load("de_core_news_sm"),
-        }
+        )
+        self.detector = LanguageDetectorBuilder.from_languages(*languages).build()
+        # Trigram-only model: much faster, and as accurate as the full one once texts are long
+        self.fast_detector = LanguageDetectorBuilder.from_languages(*languages).with_low_accuracy_mode().build()
+        # Results per normalized text; exceptions propagate so failures are not cached
+        self._detect_cached = lru_cache(maxsize=settings.lang_detect_cache_size)(self._detect)
+        # One NER batcher per language, created on first request
+        self._ner_batchers: Dict[str, MicroBatcher[str, List[Dict[str, Any]]]] = {}
+
+    @staticmethod
+    def get_pipeline(lang_code: str):
+        """spaCy NER pipeline for the language, loaded on first use; None if unsupported"""
+        name = SPACY_MODELS.get(lang_code)
+        return spacy_registry.get("spacy", name) if name else None
+
+    @staticmethod
+    def preload(lang_codes: Optional[str] = None) -> None:
+        """Load the pipelines listed in SPACY_PRELOAD (comma-separated language codes)"""
+        spec = settings.spacy_preload if lang_codes is None else lang_codes
+        for code in filter(None, (c.strip() for c in spec.split(","))):
+            LanguageDetectionService.get_pipeline(code)
     
     def detect_language(self, text: str) -> Dict[str, Any]:
-        """Detect language from text"""
-        if not text.strip():
+        """Detect language from text.
+
+        Results are cached per normalized text (case and whitespace folded),
+        so repeated commands skip detection entirely.
+        """
+        normalized = _WHITESPACE.sub(" ", text).strip().lower()
+        if not normalized:
             return {"language": "en", "confidence": 0.0}
         
         try:
-            # Use lingua for detection
-            confidence_values = self.detector.compute_language_confidence_values(text)
-            if confidence_values:
-                best_match = confidence_values[0]
-                lang_code = self._map_language_to_code(best_match.language)
-                return {
-                    "language": lang_code,
-                    "confidence": best_match.value,
-                    "alternatives": [
-                        {
-                            "language": self._map_language_to_code(lang.language),
-                            "confidence": lang.value
-                        }
-                        for lang in confidence_values[1:3]  # Top 3 alternatives
-                    ]
-                }
+            result = self._detect_cached(normalized)
+            if result is not None:
+                # Callers get their own copy of the cached result
+                return copy.deepcopy(result)
         except Exception as e:
             print(f"Language detection error: {e}")
         
         return {"language": "en", "confidence": 0.0}
+
+    def _detect(self, text: str) -> Optional[Dict[str, Any]]:
+        short = len(text) < settings.lang_detect_low_accuracy_min_chars
+        detector = self.detector if short else self.fast_detector
+        confidence_values = detector.compute_language_confidence_values(text)
+        if not confidence_values:
+            return None
+        best_match = confidence_values[0]
+        return {
+            "language": self._map_language_to_code(best_match.language),
+            "confidence": best_match.value,
+            "alternatives": [
+                {
+                    "language": self._map_language_to_code(lang.language),
+                    "confidence": lang.value
+                }
+                for lang in confidence_values[1:3]  # Top 3 alternatives
+            ]
+        }
+
+    def cache_stats(self) -> Dict[str, Any]:
+        info = self._detect_cached.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            "hits": info.hits,
+            "misses": info.misses,
+            "hit_rate": round(info.hits / lookups, 3) if lookups else 0.0,
+            "entries": info.currsize,
+            "max_entries": info.maxsize,
+        }
     
     def _map_language_to_code(self, language: Language) -> str:
         """Map lingua Language enum to ISO code"""
@@ -71,25 +141,20 @@ class LanguageDetectionService:
         }
         return mapping.get(language, "en")
     
-    def get_whisper_model(self, lang_code: str) -> str:
-        """Get appropriate Whisper model for language"""
-        # Map language codes to Whisper model names
-        model_mapping = {
-            "en": "base.en",
-            "es": "base",
-            "fr": "base",
-            "de": "base",
-            "it": "base",
-            "pt": "base",
-            "ru": "base",
-            "zh": "base",
-            "ja": "base",
-            "ko": "base",
-        }
-        return model_mapping.get(lang_code, "base")
+    @staticmethod
+    def get_whisper_model(lang_code: str, model_name: str = "base") -> str:
+        """Get appropriate Whisper model for language.
+
+        English goes to the English-only variant of `model_name` where one
+        exists (base -> base.en); every other language uses `model_name`.
+        """
+        if lang_code == "en" and model_name in ENGLISH_ONLY_WHISPER:
+            return f"{model_name}.en"
+        return model_name
     
-    def get_tts_voice(self, lang_code: str) -> str:
-        """Get appropriate TTS voice for language"""
+    @staticmethod
+    def get_tts_voice(lang_code: str, default: str = "en-US") -> str:
+        """Get appropriate TTS voice for language; `default` for unmapped codes"""
         voice_mapping = {
             "en": "en-US",
             "es": "es-ES",
@@ -102,16 +167,23 @@ class LanguageDetectionService:
             "ja": "ja-JP",
             "ko": "ko-KR",
         }
-        return voice_mapping.get(lang_code, "en-US")
+        return voice_mapping.get(lang_code, default)
     
-    async def extract_entities(self, text: str, lang_code: str) -> Dict[str, Any]:
-        """Extract named entities using spaCy"""
-        if lang_code not in self.nlp_models:
-            return {"entities": []}
-        
-        try:
-            doc = self.nlp_models[lang_code](text)
-            entities = [
+    def _ner_batcher(self, lang_code: str) -> MicroBatcher[str, List[Dict[str, Any]]]:
+        batcher = self._ner_batchers.get(lang_code)
+        if batcher is None:
+            batcher = self._ner_batchers[lang_code] = MicroBatcher(
+                partial(self._run_ner, lang_code),
+                max_batch_size=settings.ner_batch_max_size,
+                max_latency_ms=settings.ner_batch_max_latency_ms,
+            )
+        return batcher
+
+    def _run_ner(self, lang_code: str, texts: List[str]) -> List[List[Dict[str, Any]]]:
+        """Runs on a worker thread: one nlp.pipe pass over the whole batch"""
+        nlp = self.get_pipeline(lang_code)
+        return [
+            [
                 {
                     "text": ent.text,
                     "label": ent.label_,
@@ -120,10 +192,27 @@ class LanguageDetectionService:
                 }
                 for ent in doc.ents
             ]
+            for doc in nlp.pipe(texts, batch_size=len(texts))
+        ]
+
+    async def extract_entities(self, text: str, lang_code: str) -> Dict[str, Any]:
+        """Extract named entities using spaCy, off the event loop.
+
+        Concurrent requests for the same language are collected and parsed
+        together with `nlp.pipe` on a worker thread.
+        """
+        if lang_code not in SPACY_MODELS:
+            return {"entities": []}
+        
+        try:
+            entities = await self._ner_batcher(lang_code).submit(text)
             return {"entities": entities}
         except Exception as e:
             print(f"Entity extraction error: {e}")
             return {"entities": []}
+
+    def ner_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {lang: batcher.stats() for lang, batcher in self._ner_batchers.items()}
     
     def get_language_name(self, lang_code: str) -> str:
         """Get human-readable language name"""
@@ -140,3 +229,8 @@ class LanguageDetectionService:
             "ko": "Korean",
         }
         return names.get(lang_code, "English")
+
+
+@lru_cache
+def get_lang_detect_service() -> LanguageDetectionService:
+    return LanguageDetectionService()
@@ -0,0 +1,191 @@
+import gc
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..core.config import settings
+
+
+@dataclass
+class ModelEntry:
+    kind: str
+    name: str
+    model: Any
+    memory_bytes: int
+    load_seconds: float
+    loaded_at: float = field(default_factory=time.time)
+    last_used: float = field(default_factory=time.monotonic)
+    hits: int = 0
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def parse_model_list(spec: str) -> List[Tuple[str, str]]:
+    """Parse "whisper:base,speaker:speechbrain/spkrec-ecapa-voxceleb" into (kind, name) pairs"""
+    pairs = []
+    for item in spec.split(","):
+        kind, _, name = item.strip().partition(":")
+        if kind and name:
+            pairs.append((kind, name))
+    return pairs
+
+
+def _spacy_nbytes(nlp: Any) -> int:
+    """Vocab vectors plus the weights of every pipe, shared layers counted once"""
+    total = 0
+    vectors = getattr(getattr(nlp.vocab, "vectors", None), "data", None)
+    total += int(getattr(vectors, "nbytes", 0) or 0)
+    seen = set()
+    for _, pipe in nlp.pipeline:
+        model = getattr(pipe, "model", None)
+        if model is None or not hasattr(model, "walk"):
+            continue
+        for node in model.walk():
+            if id(node) in seen:
+                continue
+            seen.add(id(node))
+            for param in node.param_names:
+                if node.has_param(param):
+                    total += int(getattr(node.get_param(param), "nbytes", 0) or 0)
+            # Transformer pipes keep their weights in a wrapped torch module
+            for shim in getattr(node, "shims", ()):
+                if id(shim) not in seen:
+                    seen.add(id(shim))
+                    total += model_nbytes(getattr(shim, "_model", None))
+    return total
+
+
+def model_nbytes(model: Any) -> int:
+    """Size of the weights of a loaded model, or 0 when it cannot be measured.
+
+    Torch models (or wrappers exposing `.mods`) count their state dict rather
+    than parameters, so int8 packed weights of dynamically quantized layers
+    are counted too. spaCy pipelines count vocab vectors and pipe weights.
+    """
+    if hasattr(model, "pipeline") and hasattr(model, "vocab"):
+        return _spacy_nbytes(model)
+    try:
+        import torch
+    except ImportError:
+        return 0
+    module = model if isinstance(model, torch.nn.Module) else getattr(model, "mods", None)
+    if not isinstance(module, torch.nn.Module):
+        return 0
+
+    def nbytes(value: Any) -> int:
+        if isinstance(value, torch.Tensor):
+            return value.numel() * value.element_size()
+        if isinstance(value, (tuple, list)):
+            return sum(nbytes(v) for v in value)
+        return 0
+
+    return sum(nbytes(v) for v in module.state_dict().values())
+
+
+class ModelRegistry:
+    """Process-wide cache of loaded models, keyed by (kind, name).
+
+    Services register a loader per kind and fetch models through `get`, so
+    every router in a worker shares one instance per model. When the resident
+    total exceeds the memory budget, models idle for longer than `idle_seconds`
+    are dropped in least-recently-used order and reloaded on next use.
+    """
+
+    def __init__(self, memory_budget_mb: int = 0, idle_seconds: float = 300.0) -> None:
+        self.memory_budget = memory_budget_mb * 1024 * 1024
+        self.idle_seconds = idle_seconds
+        self._loaders: Dict[str, Callable[[str], Any]] = {}
+        self._entries: "OrderedDict[Tuple[str, str], ModelEntry]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._load_locks: Dict[Tuple[str, str], threading.Lock] = {}
+
+    def register_loader(self, kind: str, loader: Callable[[str], Any]) -> None:
+        with self._lock:
+            self._loaders.setdefault(kind, loader)
+
+    def get(self, kind: str, name: str) -> Any:
+        """Return the shared model instance, loading it on first use"""
+        key = (kind, name)
+        with self._lock:
+            entry = self._touch(key)
+            if entry is not None:
+                return entry.model
+            if kind not in self._loaders:
+                raise KeyError(f"No loader registered for model kind '{kind}'")
+            loader = self._loaders[kind]
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # Load outside the registry lock so other models stay available
+        with load_lock:
+            with self._lock:
+                entry = self._touch(key)
+                if entry is not None:
+                    return entry.model
+            rss_before = rss_bytes()
+            started = time.perf_counter()
+            model = loader(name)
+            elapsed = time.perf_counter() - started
+            memory = model_nbytes(model) or max(rss_bytes() - rss_before, 0)
+            with self._lock:
+                self._entries[key] = ModelEntry(kind, name, model, memory, elapsed)
+                self._enforce_budget(keep=key)
+            return model
+
+    def total_memory(self) -> int:
+        with self._lock:
+            return sum(e.memory_bytes for e in self._entries.values())
+
+    def stats(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "kind": e.kind,
+                    "name": e.name,
+                    "memory_mb": round(e.memory_bytes / (1024 * 1024), 1),
+                    "load_seconds": round(e.load_seconds, 2),
+                    "idle_seconds": round(now - e.last_used, 1),
+                    "hits": e.hits,
+                }
+                for e in self._entries.values()
+            ]
+
+    def _touch(self, key: Tuple[str, str]) -> Optional[ModelEntry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry.last_used = time.monotonic()
+            entry.hits += 1
+            self._entries.move_to_end(key)
+        return entry
+
+    def _enforce_budget(self, keep: Tuple[str, str]) -> None:
+        if not self.memory_budget:
+            return
+        now = time.monotonic()
+        evicted = False
+        for key in list(self._entries):
+            if self.total_memory() <= self.memory_budget:
+                break
+            entry = self._entries[key]
+            if key == keep or now - entry.last_used < self.idle_seconds:
+                continue
+            print(f"Evicting idle model {entry.kind}:{entry.name} ({entry.memory_bytes // (1024 * 1024)} MB)")
+            del self._entries[key]
+            evicted = True
+        if evicted:
+            gc.collect()
+
+
+model_registry = ModelRegistry(
+    memory_budget_mb=settings.model_memory_budget_mb,
+    idle_seconds=settings.model_idle_seconds,
+)
@@ -1,44 +1,175 @@
+import asyncio
+import hashlib
+import json
 import re
-from rapidfuzz import fuzz
-from typing import Dict, Any
+import time
+import uuid
+from rapidfuzz import fuzz, process
+from typing import Dict, Any, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select
+
+from ..core.config import settings
+
+
+DEFAULT_INTENTS: Dict[str, List[str]] = {
+    "navigate": ["navigate", "go to", "open", "enter"],
+    "show": ["show", "list", "display"],
+    "create": ["create", "new", "make"],
+    "publish": ["publish", "push live"],
+    "search": ["search", "find", "look for"],
+    "move": ["move", "relocate", "archive"],
+    "switch": ["switch", "change workspace"],
+}
+
+_CATEGORY = re.compile(r"(blog|pages?|archive|draft)s?")
+_DATE_RANGE = re.compile(r"last (week|month)")
+
+
+def extract_entities(cleaned: str) -> Dict[str, Any]:
+    entities: Dict[str, Any] = {}
+    # simplistic entity extraction
+    m = _CATEGORY.search(cleaned)
+    if m:
+        entities["category"] = m.group(1)
+    m = _DATE_RANGE.search(cleaned)
+    if m:
+        entities["date_range"] = m.group(0)
+    return entities
+
+
+class IntentMatcher:
+    """An intent vocabulary compiled for vectorized fuzzy matching.
+
+    Phrases are normalized once and kept in one flat list with a parallel
+    array of intent ids, so scoring utterances is a single
+    `rapidfuzz.process.cdist` call (partial_ratio, in C) followed by an
+    argmax per row. Ties resolve to the earliest phrase, as the original
+    per-keyword loop did.
+    """
+
+    def __init__(self, intents: Mapping[str, Sequence[str]]) -> None:
+        self.intents: List[str] = []
+        self.phrases: List[str] = []
+        labels: List[int] = []
+        for intent, phrases in intents.items():
+            cleaned = [p.strip().lower() for p in phrases if p and p.strip()]
+            if not cleaned:
+                continue
+            self.intents.append(intent)
+            self.phrases.extend(cleaned)
+            labels.extend([len(self.intents) - 1] * len(cleaned))
+        self.labels = np.asarray(labels, dtype=np.int32)
+
+    def score(self, cleaned: Sequence[str], workers: int = 1) -> Tuple[List[Optional[str]], np.ndarray]:
+        """Best intent and its 0-100 score for each (already normalized) utterance"""
+        if not cleaned or not self.phrases:
+            return [None] * len(cleaned), np.zeros(len(cleaned), dtype=np.float32)
+        scores = process.cdist(cleaned, self.phrases, scorer=fuzz.partial_ratio, dtype=np.float32, workers=workers)
+        best = scores.argmax(axis=1)
+        best_scores = scores[np.arange(len(cleaned)), best]
+        intents = [self.intents[self.labels[j]] if s > 0 else None for j, s in zip(best, best_scores)]
+        return intents, best_scores
+
+
+def vocabulary_from_settings(settings_json: Optional[Mapping[str, Any]]) -> Dict[str, List[str]]:
+    """Merge a workspace's `settings_json["nlu"]` onto the default intents.
+
+    Expected shape: {"nlu": {"intents": {"publish": ["ship it"]}, "replace_defaults": false}}
+    """
+    nlu = (settings_json or {}).get("nlu") or {}
+    custom = nlu.get("intents") or {}
+    vocab = {} if nlu.get("replace_defaults") else {k: list(v) for k, v in DEFAULT_INTENTS.items()}
+    for intent, phrases in custom.items():
+        if isinstance(phrases, str):
+            phrases = [phrases]
+        vocab.setdefault(intent, []).extend(p for p in phrases if isinstance(p, str))
+    return vocab
 
 
 class NLUService:
-    def __init__(self) -> None:
-        self.intent_keywords = {
-            "navigate": ["navigate", "go to", "open", "enter"],
-            "show": ["show", "list", "display"],
-            "create": ["create", "new", "make"],
-            "publish": ["publish", "push live"],
-            "search": ["search", "find", "look for"],
-            "move": ["move", "relocate", "archive"],
-            "switch": ["switch", "change workspace"],
-        }
+    def __init__(self, vocab_ttl_seconds: Optional[float] = None) -> None:
+        self.intent_keywords = DEFAULT_INTENTS
+        self.matcher = IntentMatcher(DEFAULT_INTENTS)
+        self.vocab_ttl = settings.nlu_vocab_ttl_seconds if vocab_ttl_seconds is None else vocab_ttl_seconds
+        # workspace id -> (matcher, vocabulary digest, checked at)
+        self._workspaces: Dict[str, Tuple[IntentMatcher, str, float]] = {}
+        self._reload_lock = asyncio.Lock()
 
-    def detect_intent(self, text: str) -> Dict[str, Any]:
+    def detect_intent(self, text: str, matcher: Optional[IntentMatcher] = None) -> Dict[str, Any]:
         cleaned = text.strip().lower()
-        best_intent = None
-        best_score = 0
-        for intent, keys in self.intent_keywords.items():
-            for k in keys:
-                score = fuzz.partial_ratio(cleaned, k)
-                if score > best_score:
-                    best_score = score
-                    best_intent = intent
-
-        entities: Dict[str, Any] = {}
-        # simplistic entity extraction
-        m = re.search(r"(blog|pages?|archive|draft)s?", cleaned)
-        if m:
-            entities["category"] = m.group(1)
-        m = re.search(r"last (week|month)", cleaned)
-        if m:
-            entities["date_range"] = m.group(0)
-
+        intents, scores = (matcher or self.matcher).score([cleaned])
         return {
-            "intent": best_intent or "unknown",
-            "confidence": best_score / 100.0,
-            "entities": entities,
+            "intent": intents[0] or "unknown",
+            "confidence": float(scores[0]) / 100.0,
+            "entities": extract_entities(cleaned),
         }
 
+    def detect_intents(
+        self,
+        texts: Sequence[str],
+        matcher: Optional[IntentMatcher] = None,
+        chunk_size: int = 4096,
+    ) -> List[Dict[str, Any]]:
+        """Batch form of `detect_intent` for offline work.
+
+        Repeated utterances (most of a command log) are scored once. Distinct
+        ones are scored in chunks of `chunk_size`, bounding the score matrix,
+        each chunk in one cdist call spread over all cores.
+        """
+        matcher = matcher or self.matcher
+        cleaned = [t.strip().lower() for t in texts]
+        unique = list(dict.fromkeys(cleaned))
+        scored: Dict[str, Dict[str, Any]] = {}
+        for i in range(0, len(unique), chunk_size):
+            chunk = unique[i:i + chunk_size]
+            intents, scores = matcher.score(chunk, workers=-1)
+            for text, intent, score in zip(chunk, intents, scores):
+                scored[text] = {
+                    "intent": intent or "unknown",
+                    "confidence": float(score) / 100.0,
+                    "entities": extract_entities(text),
+                }
+        # Copies, so callers can mutate results independently
+        return [{**scored[text], "entities": dict(scored[text]["entities"])} for text in cleaned]
+
+    async def matcher_for(self, workspace_id: Optional[str]) -> IntentMatcher:
+        """Compiled matcher for a workspace's vocabulary.
+
+        The workspace settings are re-read at most every `vocab_ttl` seconds
+        and the matcher is recompiled only when the vocabulary digest changes.
+        """
+        if not workspace_id:
+            return self.matcher
+        cached = self._workspaces.get(workspace_id)
+        if cached is not None and time.monotonic() - cached[2] < self.vocab_ttl:
+            return cached[0]
+        async with self._reload_lock:
+            cached = self._workspaces.get(workspace_id)
+            if cached is not None and time.monotonic() - cached[2] < self.vocab_ttl:
+                return cached[0]
+            try:
+                vocab = vocabulary_from_settings(await self._load_settings(workspace_id))
+            except Exception as e:
+                print(f"NLU vocabulary load error: {e}")
+                return cached[0] if cached else self.matcher
+            digest = hashlib.sha256(json.dumps(vocab, sort_keys=True).encode()).hexdigest()
+            if cached is not None and cached[1] == digest:
+                matcher = cached[0]
+            else:
+                matcher = await asyncio.to_thread(IntentMatcher, vocab)
+            self._workspaces[workspace_id] = (matcher, digest, time.monotonic())
+            return matcher
+
+    @staticmethod
+    async def _load_settings(workspace_id: str) -> Optional[dict]:
+        from ..db.session import AsyncSessionLocal
+        from ..models.workspace import Workspace
 
+        try:
+            key = uuid.UUID(str(workspace_id))
+        except ValueError:
+            return None
+        async with AsyncSessionLocal() as db:
+            return (await db.execute(select(Workspace.settings_json).where(Workspace.id == key))).scalar_one_or_none()
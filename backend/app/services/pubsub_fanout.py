@@ -0,0 +1,60 @@
+import asyncio
+from typing import Dict, Optional, Set
+
+from .redis_service import get_redis
+
+
+class RedisFanout:
+    """One Redis pattern subscription per worker, fanned out to local listeners.
+
+    Replaces a pub/sub connection per websocket: `subscribe(channel)` returns a
+    queue that receives the messages published to that channel until it is
+    unsubscribed. Messages for channels with no local listener are dropped, as
+    are messages for a listener whose queue is full.
+    """
+
+    def __init__(self, pattern: str, max_queued: int = 100) -> None:
+        self.pattern = pattern
+        self.max_queued = max_queued
+        self._redis = get_redis()
+        self._queues: Dict[str, Set[asyncio.Queue]] = {}
+        self._listener: Optional[asyncio.Task] = None
+
+    def subscribe(self, channel: str) -> asyncio.Queue:
+        self._ensure_listener()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_queued)
+        self._queues.setdefault(channel, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, channel: str, queue: asyncio.Queue) -> None:
+        queues = self._queues.get(channel)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._queues[channel]
+
+    def _ensure_listener(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._listener is None or self._listener.done() or self._listener.get_loop() is not loop:
+            self._listener = loop.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self._redis.pubsub()
+            try:
+                await pubsub.psubscribe(self.pattern)
+                async for message in pubsub.listen():
+                    if message["type"] != "pmessage":
+                        continue
+                    for queue in list(self._queues.get(message["channel"], ())):
+                        try:
+                            queue.put_nowait(message["data"])
+                        except asyncio.QueueFull:
+                            print(f"Dropped event on {message['channel']}: listener is not keeping up")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Pub/sub fan-out error ({self.pattern}): {e}")
+                await asyncio.sleep(1.0)
+            finally:
+                await pubsub.aclose()
@@ -0,0 +1,38 @@
+from typing import Any
+
+import torch
+from torch import nn
+
+from ..core.config import settings
+from .model_registry import parse_model_list
+
+
+def should_quantize(kind: str, name: str) -> bool:
+    """Whether QUANTIZE_MODELS selects this model ("kind:name" or "kind:*")"""
+    return any(
+        k == kind and n in ("*", name)
+        for k, n in parse_model_list(settings.quantize_models)
+    )
+
+
+def quantize_linear_int8(module: nn.Module) -> nn.Module:
+    """Dynamically quantize every Linear layer of `module` to int8, in place.
+
+    Subclasses of nn.Linear (Whisper's dtype-casting Linear) are downcast first,
+    since the quantized conversion only accepts the exact nn.Linear type.
+    """
+    for child in module.modules():
+        if isinstance(child, nn.Linear) and type(child) is not nn.Linear:
+            child.__class__ = nn.Linear
+    module.eval()
+    return torch.ao.quantization.quantize_dynamic(module, {nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+def quantize_model(kind: str, model: Any) -> Any:
+    """Quantize a loaded model (or a speechbrain wrapper's `.mods`) and return it"""
+    target = model if isinstance(model, nn.Module) else getattr(model, "mods", None)
+    if not isinstance(target, nn.Module):
+        print(f"Cannot quantize {kind} model of type {type(model).__name__}")
+        return model
+    quantize_linear_int8(target)
+    return model
@@ -0,0 +1,159 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import settings
+from ..db.session import AsyncSessionLocal
+from ..models.voice_profile import VoiceProfile, unpack_embedding
+from .redis_service import get_redis
+from .speaker_index import normalize
+
+
+PROFILE_EVENTS_CHANNEL = "speaker_profiles"
+
+
+@dataclass(frozen=True)
+class Reference:
+    vector: np.ndarray  # L2-normalized float32
+    threshold: float
+    passphrase_hash: str
+
+
+class ReferenceCache:
+    """Per-worker TTL/LRU cache of verification references keyed by user id.
+
+    Entries expire after `ttl_seconds` as a safety net; the real invalidation
+    is a Redis pub/sub message sent on enroll, which every worker listens for
+    so that a re-enrolled voice is never verified against a stale vector.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 600.0) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[Reference, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = get_redis()
+        self._listener: Optional[asyncio.Task] = None
+        self._callbacks: List[Callable[[str], Awaitable[None]]] = []
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.invalidations = 0
+
+    def get(self, user_id: str) -> Optional[Reference]:
+        key = str(user_id)
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            ref, expires = item
+            if time.monotonic() >= expires:
+                del self._entries[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return ref
+
+    def put(self, user_id: str, ref: Reference) -> None:
+        with self._lock:
+            self._entries[str(user_id)] = (ref, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(str(user_id))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: str) -> None:
+        with self._lock:
+            if self._entries.pop(str(user_id), None) is not None:
+                self.invalidations += 1
+
+    async def publish_change(self, user_id: str) -> None:
+        """Tell every worker (this one included) that the user's profile changed"""
+        self.invalidate(user_id)
+        try:
+            await self._redis.publish(PROFILE_EVENTS_CHANNEL, str(user_id))
+        except Exception as e:
+            print(f"Speaker profile publish error: {e}")
+
+    def on_change(self, callback: Callable[[str], Awaitable[None]]) -> None:
+        """Also run `callback(user_id)` for every profile change message"""
+        self._callbacks.append(callback)
+
+    def ensure_listener(self) -> None:
+        """Start the invalidation listener on the running loop if it is not running"""
+        loop = asyncio.get_running_loop()
+        if self._listener is None or self._listener.done() or self._listener.get_loop() is not loop:
+            self._listener = loop.create_task(self._listen())
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self._redis.pubsub()
+            try:
+                await pubsub.subscribe(PROFILE_EVENTS_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self.invalidate(message["data"])
+                        for callback in self._callbacks:
+                            await callback(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Entries may have been missed while disconnected
+                print(f"Speaker profile listener error: {e}")
+                self.clear()
+                await asyncio.sleep(1.0)
+            finally:
+                await pubsub.aclose()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "entries": len(self._entries),
+                "listening": self._listener is not None and not self._listener.done(),
+            }
+
+
+reference_cache = ReferenceCache(
+    max_entries=settings.speaker_cache_max_entries,
+    ttl_seconds=settings.speaker_cache_ttl_seconds,
+)
+
+
+async def get_reference(user_id: str, db: Optional[AsyncSession] = None) -> Optional[Reference]:
+    """Cached verification reference for the user, or None if not enrolled"""
+    reference_cache.ensure_listener()
+    ref = reference_cache.get(user_id)
+    if ref is not None:
+        return ref
+    stmt = select(VoiceProfile.embedding, VoiceProfile.threshold, VoiceProfile.passphrase_hash).where(
+        VoiceProfile.user_id == user_id
+    )
+    if db is not None:
+        row = (await db.execute(stmt)).first()
+    else:
+        async with AsyncSessionLocal() as session:
+            row = (await session.execute(stmt)).first()
+    if row is None or row.embedding is None:
+        return None
+    ref = Reference(normalize(unpack_embedding(row.embedding)), row.threshold, row.passphrase_hash)
+    reference_cache.put(user_id, ref)
+    return ref
@@ -1,35 +1,114 @@
 import asyncio
+from functools import lru_cache
+from pathlib import Path
 from typing import List, Tuple
 import numpy as np
+import torch
 from speechbrain.pretrained import SpeakerRecognition
 
+from ..core.config import settings
+from .audio_io import decode_audio_bytes
+from .batching import MicroBatcher
+from .inference_pool import get_inference_pool
+from .model_registry import model_registry
+from .quantization import quantize_model, should_quantize
+
+
+SPEAKER_MODEL = "speechbrain/spkrec-ecapa-voxceleb"
+
+
+def load_speaker_model(source: str) -> SpeakerRecognition:
+    # Downloads model on first use
+    rec = SpeakerRecognition.from_hparams(source=source, savedir=".cache/speechbrain")
+    if should_quantize("speaker", source):
+        rec = quantize_model("speaker", rec)
+    return rec
+
+
+model_registry.register_loader("speaker", load_speaker_model)
+
+
+def _check_not_empty(arrays: List[np.ndarray]) -> None:
+    # A zero-length clip would make the relative lengths (wav_lens) divide by zero
+    if not arrays or any(len(a) == 0 for a in arrays):
+        raise ValueError("Audio contains no samples")
+
 
 class SpeakerIdService:
-    def __init__(self) -> None:
-        # Downloads model on first use
-        self._rec = SpeakerRecognition.from_hparams(
-            source="speechbrain/spkrec-ecapa-voxceleb", savedir=".cache/speechbrain"
+    def __init__(self, model_name: str = SPEAKER_MODEL) -> None:
+        self.model_name = model_name
+        # Load eagerly so initialization errors surface to the caller; pool workers preload their own copy
+        if get_inference_pool() is None:
+            model_registry.get("speaker", self.model_name)
+        # Concurrent single-clip requests (verify, identify) share one forward pass
+        self._batcher: MicroBatcher[np.ndarray, np.ndarray] = MicroBatcher(
+            self._dispatch_batch,
+            max_batch_size=settings.speaker_batch_max_size,
+            max_latency_ms=settings.speaker_batch_max_latency_ms,
         )
 
-    async def embed_file(self, wav_path: str) -> List[float]:
-        def _embed() -> List[float]:
-            emb = self._rec.encode_batch(wav_path)
-            vec = emb.squeeze().detach().cpu().numpy()
-            return vec.astype(float).tolist()
+    @property
+    def _rec(self) -> SpeakerRecognition:
+        return model_registry.get("speaker", self.model_name)
 
-        return await asyncio.to_thread(_embed)
+    def _embed_batch(self, arrays: List[np.ndarray]) -> np.ndarray:
+        """One forward pass over zero-padded waveforms; returns (len(arrays), dim) float32"""
+        _check_not_empty(arrays)
+        lengths = np.array([len(a) for a in arrays], dtype=np.float32)
+        wavs = np.zeros((len(arrays), int(lengths.max())), dtype=np.float32)
+        for i, audio in enumerate(arrays):
+            wavs[i, : len(audio)] = audio
+        with torch.no_grad():
+            emb = self._rec.encode_batch(torch.from_numpy(wavs), torch.from_numpy(lengths / lengths.max()))
+        return emb.reshape(len(arrays), -1).detach().cpu().numpy().astype(np.float32)
+
+    def _embed_array(self, audio: np.ndarray) -> np.ndarray:
+        return self._embed_batch([audio])[0]
+
+    async def embed_many(self, arrays: List[np.ndarray]) -> np.ndarray:
+        """Embed several 16 kHz mono float32 clips in a single batch"""
+        _check_not_empty(arrays)
+        pool = get_inference_pool()
+        if pool is not None:
+            return await pool.run(_pool_embed_batch, arrays, self.model_name)
+        return await asyncio.to_thread(self._embed_batch, arrays)
+
+    async def _dispatch_batch(self, arrays: List[np.ndarray]) -> List[np.ndarray]:
+        return list(await self.embed_many(arrays))
+
+    async def embed_array(self, audio: np.ndarray) -> np.ndarray:
+        """Embed 16 kHz mono float32 samples, micro-batched with concurrent callers"""
+        # Rejected here so an empty clip fails alone rather than its whole batch
+        _check_not_empty([audio])
+        return await self._batcher.submit(audio)
+
+    async def embed_bytes(self, data: bytes) -> np.ndarray:
+        audio = await asyncio.to_thread(decode_audio_bytes, data)
+        return await self.embed_array(audio)
+
+    async def embed_file(self, wav_path: str) -> np.ndarray:
+        data = await asyncio.to_thread(Path(wav_path).read_bytes)
+        return await self.embed_bytes(data)
 
     @staticmethod
-    def cosine_similarity(a: List[float], b: List[float]) -> float:
-        va = np.array(a)
-        vb = np.array(b)
+    def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
+        va = np.asarray(a, dtype=np.float32)
+        vb = np.asarray(b, dtype=np.float32)
         denom = (np.linalg.norm(va) * np.linalg.norm(vb)) or 1.0
         return float(np.dot(va, vb) / denom)
 
-    async def average_embeddings(self, wav_paths: List[str]) -> List[float]:
-        embeddings = [await self.embed_file(p) for p in wav_paths]
-        arr = np.array(embeddings)
-        mean_vec = arr.mean(axis=0)
-        return mean_vec.astype(float).tolist()
+    async def average_embeddings(self, samples: List[bytes]) -> np.ndarray:
+        """Mean embedding of encoded audio samples held in memory"""
+        arrays = await asyncio.gather(*(asyncio.to_thread(decode_audio_bytes, data) for data in samples))
+        return (await self.embed_many(list(arrays))).mean(axis=0)
+
+
+def _pool_embed_batch(arrays: List[np.ndarray], model_name: str) -> np.ndarray:
+    # Runs inside an inference pool worker, where the model is preloaded
+    return SpeakerIdService(model_name)._embed_batch(arrays)
 
 
+@lru_cache
+def get_speaker_service() -> SpeakerIdService:
+    """Shared service so every caller batches together; a failed load is retried on the next call"""
+    return SpeakerIdService()
@@ -0,0 +1,190 @@
+import json
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from ..core.config import settings
+
+
+def normalize(vector) -> np.ndarray:
+    vec = np.asarray(vector, dtype=np.float32).reshape(-1)
+    norm = float(np.linalg.norm(vec))
+    return vec / norm if norm else vec
+
+
+class SpeakerIndex:
+    """In-memory 1:N index of enrolled speakers.
+
+    Reference embeddings are kept L2-normalized in one float32 matrix, so
+    scoring a probe against every profile is a single matrix-vector product
+    and top-k selection uses argpartition instead of a full sort. Rows are
+    added and removed in place (removal swaps in the last row). The matrix can
+    be snapshotted to a `.npy` file that is memory-mapped copy-on-write on
+    the next start, which avoids rebuilding from the database. Each row
+    carries a fingerprint of the stored embedding so a snapshot can be
+    checked against the database before it is trusted.
+    """
+
+    def __init__(self, dim: int = 192) -> None:
+        self.dim = dim
+        self._lock = threading.RLock()
+        self._matrix = np.zeros((0, dim), dtype=np.float32)
+        self._thresholds = np.zeros(0, dtype=np.float32)
+        self._ids: List[str] = []
+        self._fingerprints: List[Optional[str]] = []
+        self._pos: Dict[str, int] = {}
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def build(self, rows: Iterable[Tuple[str, object, float, Optional[str]]]) -> None:
+        """Replace the index with (user_id, embedding, threshold, fingerprint) rows"""
+        ids, vectors, thresholds, fingerprints = [], [], [], []
+        for user_id, vector, threshold, fingerprint in rows:
+            if vector is None or len(vector) == 0:
+                continue
+            ids.append(str(user_id))
+            vectors.append(normalize(vector))
+            thresholds.append(threshold)
+            fingerprints.append(fingerprint)
+        with self._lock:
+            if vectors:
+                self.dim = vectors[0].shape[0]
+            self._matrix = np.stack(vectors) if vectors else np.zeros((0, self.dim), dtype=np.float32)
+            self._thresholds = np.asarray(thresholds, dtype=np.float32)
+            self._ids = ids
+            self._fingerprints = fingerprints
+            self._pos = {user_id: i for i, user_id in enumerate(ids)}
+            self.loaded = True
+
+    def add(self, user_id: str, vector, threshold: float = 0.75, fingerprint: Optional[str] = None) -> None:
+        """Insert or replace one profile"""
+        user_id = str(user_id)
+        vec = normalize(vector)
+        with self._lock:
+            i = self._pos.get(user_id)
+            if i is None:
+                if not self._ids:
+                    self.dim = vec.shape[0]
+                    self._matrix = np.zeros((0, self.dim), dtype=np.float32)
+                # Concatenation also detaches a memory-mapped snapshot from its file
+                self._matrix = np.concatenate([self._matrix[: len(self._ids)], vec[None, :]])
+                self._thresholds = np.append(self._thresholds[: len(self._ids)], np.float32(threshold))
+                self._pos[user_id] = len(self._ids)
+                self._ids.append(user_id)
+                self._fingerprints.append(fingerprint)
+            else:
+                self._matrix[i] = vec
+                self._thresholds[i] = threshold
+                self._fingerprints[i] = fingerprint
+
+    def remove(self, user_id: str) -> bool:
+        user_id = str(user_id)
+        with self._lock:
+            i = self._pos.pop(user_id, None)
+            if i is None:
+                return False
+            last = len(self._ids) - 1
+            if i != last:
+                self._matrix[i] = self._matrix[last]
+                self._thresholds[i] = self._thresholds[last]
+                self._ids[i] = self._ids[last]
+                self._fingerprints[i] = self._fingerprints[last]
+                self._pos[self._ids[i]] = i
+            self._ids.pop()
+            self._fingerprints.pop()
+            self._matrix = self._matrix[:last]
+            self._thresholds = self._thresholds[:last]
+            return True
+
+    def search(self, vector, k: int = 5) -> List[Dict[str, object]]:
+        """Top-k profiles by cosine similarity to `vector`"""
+        probe = normalize(vector)
+        with self._lock:
+            n = len(self._ids)
+            if n == 0:
+                return []
+            scores = self._matrix[:n] @ probe
+            k = min(k, n)
+            top = np.argpartition(-scores, k - 1)[:k] if k < n else np.arange(n)
+            top = top[np.argsort(-scores[top])]
+            return [
+                {
+                    "user_id": self._ids[i],
+                    "score": float(scores[i]),
+                    "match": bool(scores[i] >= self._thresholds[i]),
+                }
+                for i in top
+            ]
+
+    def save(self, path: str) -> None:
+        """Write `<path>` (.npy matrix) and `<path>.json` (ids, thresholds, fingerprints) atomically"""
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            matrix = np.ascontiguousarray(self._matrix[: len(self._ids)])
+            meta = {
+                "dim": self.dim,
+                "ids": list(self._ids),
+                "thresholds": self._thresholds.tolist(),
+                "fingerprints": list(self._fingerprints),
+            }
+        suffix = f".{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        tmp_matrix = target.with_name(target.name + suffix)
+        tmp_meta = target.with_name(target.name + ".json" + suffix)
+        try:
+            with open(tmp_matrix, "wb") as f:
+                np.save(f, matrix)
+            tmp_meta.write_text(json.dumps(meta))
+            os.replace(tmp_matrix, target)
+            os.replace(tmp_meta, target.with_name(target.name + ".json"))
+        finally:
+            tmp_matrix.unlink(missing_ok=True)
+            tmp_meta.unlink(missing_ok=True)
+
+    def load(self, path: str) -> bool:
+        """Memory-map a snapshot written by `save`; returns False if there is none"""
+        target = Path(path)
+        meta_path = target.with_name(target.name + ".json")
+        if not target.exists() or not meta_path.exists():
+            return False
+        meta = json.loads(meta_path.read_text())
+        matrix = np.load(target, mmap_mode="c")
+        if matrix.shape[0] != len(meta["ids"]):
+            return False
+        with self._lock:
+            self.dim = meta["dim"]
+            self._matrix = matrix
+            self._thresholds = np.asarray(meta["thresholds"], dtype=np.float32)
+            self._ids = list(meta["ids"])
+            self._fingerprints = list(meta.get("fingerprints") or [None] * len(self._ids))
+            self._pos = {user_id: i for i, user_id in enumerate(self._ids)}
+            self.loaded = True
+        return True
+
+    def matches(self, rows: Iterable[Tuple[str, Optional[str], float]]) -> bool:
+        """Whether the index holds exactly these (user_id, fingerprint, threshold) rows"""
+        with self._lock:
+            expected = {
+                user_id: (fingerprint, float(threshold))
+                for user_id, fingerprint, threshold in zip(self._ids, self._fingerprints, self._thresholds)
+            }
+        seen = 0
+        for user_id, fingerprint, threshold in rows:
+            current = expected.get(str(user_id))
+            if current is None or current[0] is None or current != (fingerprint, float(np.float32(threshold))):
+                return False
+            seen += 1
+        return seen == len(expected)
+
+
+speaker_index = SpeakerIndex()
+
+
+def snapshot_path() -> Optional[str]:
+    return settings.speaker_index_snapshot or None
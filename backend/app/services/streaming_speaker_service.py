@@ -0,0 +1,86 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import numpy as np
+
+from ..core.config import settings
+from .audio_io import SAMPLE_RATE
+from .speaker_cache import get_reference
+from .speaker_id_service import SpeakerIdService
+from .speaker_index import normalize
+from .streaming_stt_service import StreamingTranscriber
+from .vad_service import vad
+
+
+logger = logging.getLogger(__name__)
+
+MIN_CLIP_SECONDS = 1.0
+
+
+class StreamingSpeakerVerifier:
+    """Periodic speaker verification over a live voice session.
+
+    Reads the most recent audio straight from the session's STT ring buffer
+    (no second buffer), trims silence at the edges and scores one ECAPA
+    embedding against the user's cached reference. At most one embedding is
+    in flight per session, and a new one starts only after `interval_seconds`
+    and once enough new speech has arrived, so the cost stays a small fraction
+    of the STT work.
+    """
+
+    def __init__(
+        self,
+        speaker: SpeakerIdService,
+        user_id: str,
+        interval_seconds: Optional[float] = None,
+        window_seconds: Optional[float] = None,
+    ) -> None:
+        self.speaker = speaker
+        self.user_id = user_id
+        self.interval = interval_seconds or settings.speaker_stream_interval_seconds
+        self.window = int((window_seconds or settings.speaker_stream_window_seconds) * SAMPLE_RATE)
+        self.disabled = False
+        self._task: Optional[asyncio.Task] = None
+        self._last_at = float("-inf")
+        self._speech_mark = 0
+
+    def poll(self, session: StreamingTranscriber, send: Callable[[Dict[str, Any]], Awaitable[None]]) -> None:
+        """Start a verification if one is due; never blocks the caller"""
+        if self.disabled or (self._task is not None and not self._task.done()):
+            return
+        if time.monotonic() - self._last_at < self.interval:
+            return
+        if session.speech_samples - self._speech_mark < self.window // 2:
+            return
+        tail = session.buffer.tail(self.window)
+        start, end = vad.trim(tail)
+        if end - start < MIN_CLIP_SECONDS * SAMPLE_RATE:
+            return
+        self._last_at = time.monotonic()
+        self._speech_mark = session.speech_samples
+        self._task = asyncio.create_task(self._score(tail[start:end], send))
+
+    async def _score(self, clip: np.ndarray, send: Callable[[Dict[str, Any]], Awaitable[None]]) -> None:
+        try:
+            ref = await get_reference(self.user_id)
+            if ref is None:
+                # Not enrolled: nothing to verify against for this session
+                self.disabled = True
+                return
+            probe = await self.speaker.embed_array(clip)
+            score = float(ref.vector @ normalize(probe))
+            await send({
+                "type": "speaker_score",
+                "score": round(score, 4),
+                "match": score >= ref.threshold,
+                "threshold": ref.threshold,
+                "seconds": round(len(clip) / SAMPLE_RATE, 2),
+            })
+        except Exception as e:
+            logger.warning("Speaker verification error: %s", e)
+
+    def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
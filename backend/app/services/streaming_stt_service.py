@@ -0,0 +1,219 @@
+import re
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from ..core.config import settings
+from .audio_io import SAMPLE_RATE, pcm16_to_float32
+from .stt_whisper_service import WhisperSTTService, stt_service_for
+from .vad_service import vad
+
+
+_WORD_NORMALIZE = re.compile(r"[^\w']+")
+PAUSE_TAIL_SECONDS = 0.2
+
+
+class PCMRingBuffer:
+    """Fixed-capacity float32 ring buffer addressed by absolute sample index"""
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self._buf = np.zeros(capacity, dtype=np.float32)
+        # Absolute index of the oldest retained sample and one past the newest
+        self.start = 0
+        self.end = 0
+
+    def __len__(self) -> int:
+        return self.end - self.start
+
+    def append(self, samples: np.ndarray) -> None:
+        n = len(samples)
+        if n == 0:
+            return
+        if n > self.capacity:
+            samples = samples[-self.capacity:]
+        pos = (self.end + n - len(samples)) % self.capacity
+        first = min(len(samples), self.capacity - pos)
+        self._buf[pos:pos + first] = samples[:first]
+        if first < len(samples):
+            self._buf[:len(samples) - first] = samples[first:]
+        self.end += n
+        self.start = max(self.start, self.end - self.capacity)
+
+    def view(self, start: int, end: int) -> np.ndarray:
+        """Return samples in [start, end); zero-copy unless the range wraps"""
+        start = max(start, self.start)
+        end = min(end, self.end)
+        if end <= start:
+            return np.zeros(0, dtype=np.float32)
+        i = start % self.capacity
+        j = i + (end - start)
+        if j <= self.capacity:
+            return self._buf[i:j]
+        return np.concatenate((self._buf[i:], self._buf[:j - self.capacity]))
+
+    def tail(self, n: int) -> np.ndarray:
+        """The newest `n` samples, including ones already discarded but not yet overwritten"""
+        n = min(n, self.capacity, self.end)
+        i = (self.end - n) % self.capacity
+        if i + n <= self.capacity:
+            return self._buf[i:i + n]
+        return np.concatenate((self._buf[i:], self._buf[:i + n - self.capacity]))
+
+    def discard_until(self, index: int) -> None:
+        self.start = max(self.start, min(index, self.end))
+
+
+def _normalize(word: str) -> str:
+    return _WORD_NORMALIZE.sub("", word.lower())
+
+
+def _join(words: List[Dict[str, Any]]) -> str:
+    return "".join(w["word"] for w in words).strip()
+
+
+def _confidence(words: List[Dict[str, Any]]) -> float:
+    if not words:
+        return 0.0
+    return round(float(np.mean([w["probability"] for w in words])), 3)
+
+
+class StreamingTranscriber:
+    """Incremental Whisper transcription over a sliding PCM window.
+
+    Audio is re-decoded from the end of the committed text only. A word is
+    committed once two consecutive decodes agree on it, after which its audio
+    is dropped from the window and its text is only used as the decoding
+    prompt. Steps without speech are never decoded: they commit any pending
+    words, end the utterance and their audio is discarded. Once the language is known (given, or
+    detected by the first decode) the session moves to that language's
+    model, e.g. base.en.
+    """
+
+    def __init__(
+        self,
+        stt: WhisperSTTService,
+        language: Optional[str] = None,
+        step_seconds: Optional[float] = None,
+        max_window_seconds: Optional[float] = None,
+    ) -> None:
+        self.stt = stt_service_for(language, stt.model_name)
+        self.language = language
+        self.step = int((step_seconds or settings.stt_stream_step_seconds) * SAMPLE_RATE)
+        self.max_window = int((max_window_seconds or settings.stt_stream_max_window_seconds) * SAMPLE_RATE)
+        # Headroom so audio arriving during a decode never overwrites the window
+        self.buffer = PCMRingBuffer(self.max_window * 2)
+        self.committed_text = ""
+        self._pending: List[Dict[str, Any]] = []
+        # Words committed since the last pause, reported together as stt_final
+        self._utterance: List[Dict[str, Any]] = []
+        self._last_decode_end = 0
+        self.dropped_seconds = 0.0
+        self.speech_samples = 0
+
+    async def feed(self, pcm: bytes) -> List[Dict[str, Any]]:
+        """Append raw PCM and return any stt_partial/stt_commit/stt_final events"""
+        self.buffer.append(pcm16_to_float32(pcm))
+        if self.buffer.end - self._last_decode_end < self.step:
+            return []
+        fresh = self.buffer.view(self._last_decode_end, self.buffer.end)
+        if not vad.has_speech(fresh):
+            vad.record(len(fresh), 0)
+            self.dropped_seconds += len(fresh) / SAMPLE_RATE
+            return self._on_pause()
+        vad.record(len(fresh), len(fresh))
+        self.speech_samples += len(fresh)
+        return await self._decode()
+
+    def _on_pause(self) -> List[Dict[str, Any]]:
+        """No speech since the last decode: end the utterance and drop the silence"""
+        self._last_decode_end = self.buffer.end
+        events = self._commit(self._pending)
+        self._pending = []
+        events.extend(self._end_utterance())
+        # Keep a short tail so the onset of the next word is not clipped
+        self.buffer.discard_until(self.buffer.end - int(PAUSE_TAIL_SECONDS * SAMPLE_RATE))
+        return events
+
+    async def flush(self) -> List[Dict[str, Any]]:
+        """Decode what is left, commit it and end the utterance"""
+        events: List[Dict[str, Any]] = []
+        if len(self.buffer) > 0 and self.buffer.end > self._last_decode_end:
+            events = [e for e in await self._decode() if e["type"] == "stt_commit"]
+        events.extend(self._commit(self._pending))
+        self._pending = []
+        events.extend(self._end_utterance())
+        self.buffer.discard_until(self.buffer.end)
+        return events
+
+    async def _decode(self) -> List[Dict[str, Any]]:
+        window_start = self.buffer.start
+        window = self.buffer.view(window_start, self.buffer.end)
+        self._last_decode_end = self.buffer.end
+        prompt = self.committed_text[-200:] or None
+        result = await self.stt.transcribe_window(window, language=self.language, prompt=prompt)
+        if self.language is None and result.get("language"):
+            self.language = result["language"]
+            self.stt = stt_service_for(self.language, self.stt.model_name)
+
+        offset = window_start / SAMPLE_RATE
+        hypothesis = [
+            {**w, "start": round(w["start"] + offset, 3), "end": round(w["end"] + offset, 3)}
+            for w in result["words"]
+            if _normalize(w["word"])
+        ]
+
+        agreed = 0
+        for prev, cur in zip(self._pending, hypothesis):
+            if _normalize(prev["word"]) != _normalize(cur["word"]):
+                break
+            agreed += 1
+
+        events: List[Dict[str, Any]] = []
+        if len(window) >= self.max_window:
+            # Window is full: finalize everything rather than let it grow
+            events.extend(self._commit(hypothesis))
+            self._pending = []
+            if not hypothesis:
+                self.buffer.discard_until(self.buffer.end - self.step)
+            return events
+
+        if agreed:
+            events.extend(self._commit(hypothesis[:agreed]))
+        self._pending = hypothesis[agreed:]
+        if self._pending:
+            events.append({
+                "type": "stt_partial",
+                "text": _join(self._pending),
+                "start": self._pending[0]["start"],
+                "end": self._pending[-1]["end"],
+                "confidence": _confidence(self._pending),
+            })
+        return events
+
+    def _commit(self, words: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not words:
+            return []
+        text = _join(words)
+        self.committed_text = f"{self.committed_text} {text}".strip()
+        self.buffer.discard_until(int(words[-1]["end"] * SAMPLE_RATE))
+        self._utterance.extend(words)
+        return [{
+            "type": "stt_commit",
+            "text": text,
+            "start": words[0]["start"],
+            "end": words[-1]["end"],
+            "confidence": _confidence(words),
+        }]
+
+    def _end_utterance(self) -> List[Dict[str, Any]]:
+        words, self._utterance = self._utterance, []
+        if not words:
+            return []
+        return [{
+            "type": "stt_final",
+            "text": _join(words),
+            "start": words[0]["start"],
+            "end": words[-1]["end"],
+            "confidence": _confidence(words),
+        }]
@@ -1,20 +1,416 @@
 import asyncio
+import math
+import re
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
+import numpy as np
+import torch
 import whisper
+from whisper.audio import HOP_LENGTH, N_FRAMES, N_SAMPLES
+from whisper.timing import find_alignment, merge_punctuations
+from whisper.tokenizer import get_tokenizer
+
+from ..core.config import settings
+from .audio_io import SAMPLE_RATE, decode_audio_bytes
+from .batching import MicroBatcher
+from .inference_pool import get_inference_pool
+from .lang_detect_service import LanguageDetectionService
+from .model_registry import model_registry
+from .quantization import quantize_model, should_quantize
+from .vad_service import vad
+
+
+# Same defaults whisper.transcribe uses when attaching punctuation to words
+PREPEND_PUNCTUATIONS = "\"'“¿([{-"
+APPEND_PUNCTUATIONS = "\"'.。,，!！?？:：”)]}、"
+
+# whisper.transcribe's decoding fallback: retry hotter when output looks degenerate
+TEMPERATURES = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+
+# How close to a forced cut a word must end/start to count as split by it
+CUT_TOLERANCE_SECONDS = 0.15
+
+_WORD_NORMALIZE = re.compile(r"[^\w']+")
+
+
+def load_whisper_model(name: str) -> whisper.Whisper:
+    if should_quantize("whisper", name):
+        # Dynamic int8 kernels are CPU-only
+        return quantize_model("whisper", whisper.load_model(name, device="cpu"))
+    return whisper.load_model(name)
+
+
+model_registry.register_loader("whisper", load_whisper_model)
+
+
+def _is_silent(res: Any) -> bool:
+    return res.no_speech_prob > NO_SPEECH_THRESHOLD and res.avg_logprob < LOGPROB_THRESHOLD
+
+
+def _needs_fallback(res: Any) -> bool:
+    if _is_silent(res):
+        return False
+    return res.compression_ratio > COMPRESSION_RATIO_THRESHOLD or res.avg_logprob < LOGPROB_THRESHOLD
+
+
+class _EncodedModel:
+    """Stands in for the model in `find_alignment`, decoding against encoder
+    output the batch already computed instead of re-encoding the mel"""
+
+    def __init__(self, model: whisper.Whisper, features: torch.Tensor) -> None:
+        self._model = model
+        self._features = features
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._model, name)
+
+    def __call__(self, mel: torch.Tensor, tokens: torch.Tensor) -> torch.Tensor:
+        return self._model.decoder(tokens, self._features)
+
+
+def _to_segment(bounds: Tuple[int, int], result: Dict[str, Any]) -> Dict[str, Any]:
+    """Place a chunk result on the global timeline"""
+    offset = bounds[0] / SAMPLE_RATE
+    segment = {
+        "start": round(offset, 2),
+        "end": round(bounds[1] / SAMPLE_RATE, 2),
+        "text": result["text"],
+        "language": result.get("language"),
+    }
+    if result.get("words"):
+        segment["words"] = [
+            {**w, "start": round(w["start"] + offset, 3), "end": round(w["end"] + offset, 3)}
+            for w in result["words"]
+        ]
+    return segment
+
+
+def _stitch(segments: List[Dict[str, Any]]) -> str:
+    """Join chunk texts, dropping a word split in two by a forced (mid-speech) cut.
+
+    Across a cut, the last word before it and the first after it are one word
+    only if they match and their timings meet at the cut; a word genuinely
+    said twice is separated by a gap and kept.
+    """
+    parts: List[str] = []
+    prev: Optional[Dict[str, Any]] = None
+    for seg in segments:
+        text = seg["text"]
+        if prev is not None and parts and seg["start"] <= prev["end"] and prev.get("words") and seg.get("words"):
+            last, first = prev["words"][-1], seg["words"][0]
+            rest = text.partition(" ")[2]
+            if (
+                rest
+                and _WORD_NORMALIZE.sub("", first["word"].lower()) == _WORD_NORMALIZE.sub("", last["word"].lower())
+                and last["end"] >= prev["end"] - CUT_TOLERANCE_SECONDS
+                and first["start"] <= seg["start"] + CUT_TOLERANCE_SECONDS
+            ):
+                text = rest
+        parts.append(text)
+        prev = seg
+    return " ".join(parts)
 
 
 class WhisperSTTService:
     def __init__(self, model_name: str = "base") -> None:
         self.model_name = model_name
-        self._model = whisper.load_model(model_name)
+        # Clips up to 30 s share one encoder pass with concurrent requests
+        self._batcher: MicroBatcher[Dict[str, Any], Dict[str, Any]] = MicroBatcher(
+            self._dispatch_batch,
+            max_batch_size=settings.stt_batch_max_size,
+            max_latency_ms=settings.stt_batch_max_latency_ms,
+        )
+
+    @property
+    def model(self) -> whisper.Whisper:
+        return model_registry.get("whisper", self.model_name)
+
+    async def _dispatch_batch(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        pool = get_inference_pool()
+        if pool is None:
+            return await asyncio.to_thread(self._run_batch, requests)
+        audio = [r["audio"] for r in requests]
+        options = [{k: v for k, v in r.items() if k != "audio"} for r in requests]
+        return await pool.run(_pool_run_batch, audio, self.model_name, options)
+
+    def _run_batch(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Transcribe up-to-30 s clips with a single batched encoder pass"""
+        model = self.model
+        fp16 = model.device.type == "cuda"
+        mels = torch.stack([
+            whisper.log_mel_spectrogram(
+                whisper.pad_or_trim(torch.from_numpy(np.asarray(r["audio"], dtype=np.float32))),
+                n_mels=model.dims.n_mels,
+            )
+            for r in requests
+        ]).to(model.device)
+
+        with torch.no_grad():
+            features = model.embed_audio(mels.half() if fp16 else mels)
+
+        results: List[Dict[str, Any]] = [{} for _ in requests]
+        detect = [i for i, r in enumerate(requests) if r.get("detect_language")]
+        if detect:
+            for i, res in zip(detect, self._detect_language(model, features[detect])):
+                results[i] = res
+
+        # Decoder options (language, prompt) are per call, so decode compatible groups together
+        groups: Dict[Tuple[Optional[str], Optional[str]], List[int]] = {}
+        for i, r in enumerate(requests):
+            if not r.get("detect_language"):
+                groups.setdefault((r.get("language"), r.get("prompt")), []).append(i)
+
+        for (language, prompt), idx in groups.items():
+            # English-only models have no language tokens to detect with
+            if language is None and not model.is_multilingual:
+                language = "en"
+            decoded = self._decode_with_fallback(model, features[idx], language, prompt, fp16)
+            for i, res in zip(idx, decoded):
+                results[i] = self._format_result(model, requests[i], res, mels[i], features[i:i + 1])
+        return results
+
+    @staticmethod
+    def _decode_with_fallback(
+        model: whisper.Whisper,
+        features: torch.Tensor,
+        language: Optional[str],
+        prompt: Optional[str],
+        fp16: bool,
+    ) -> List[Any]:
+        """Greedy decode, then re-decode only the items that fail whisper.transcribe's
+        compression-ratio/log-prob checks at each higher temperature"""
+        results: List[Any] = [None] * features.shape[0]
+        pending = list(range(features.shape[0]))
+        for temperature in TEMPERATURES:
+            options = whisper.DecodingOptions(
+                language=language,
+                prompt=prompt,
+                temperature=temperature,
+                without_timestamps=True,
+                fp16=fp16,
+            )
+            decoded = whisper.decode(model, features[pending], options)
+            retry: List[int] = []
+            for i, res in zip(pending, decoded):
+                results[i] = res
+                if _needs_fallback(res):
+                    retry.append(i)
+            if not retry:
+                break
+            pending = retry
+        return results
+
+    @staticmethod
+    def _detect_language(model: whisper.Whisper, features: torch.Tensor) -> List[Dict[str, Any]]:
+        """Spoken-language ID from already-encoded audio: one decoder step per item"""
+        if not model.is_multilingual:
+            return [{"language": "en", "confidence": 1.0} for _ in range(features.shape[0])]
+        with torch.no_grad():
+            _, probs = model.detect_language(features)
+        results = []
+        for p in probs:
+            language = max(p, key=p.get)
+            results.append({"language": language, "confidence": round(float(p[language]), 3)})
+        return results
+
+    async def detect_language(self, audio: np.ndarray, seconds: Optional[float] = None) -> Dict[str, Any]:
+        """Whisper's spoken-language ID over the first `seconds` of speech.
+
+        Goes through the batcher, so it shares an encoder pass with
+        concurrent transcriptions and adds one decoder step.
+        """
+        if self.model_name.endswith(".en"):
+            return {"language": "en", "confidence": 1.0}
+        limit = int((seconds or settings.lang_detect_audio_seconds) * SAMPLE_RATE)
+        start, end = await asyncio.to_thread(vad.trim, audio[:N_SAMPLES])
+        if end <= start:
+            return {"language": None, "confidence": 0.0}
+        return await self._batcher.submit({
+            "audio": audio[start:min(end, start + limit)],
+            "detect_language": True,
+        })
+
+    @staticmethod
+    def _format_result(
+        model: whisper.Whisper,
+        request: Dict[str, Any],
+        res: Any,
+        mel: torch.Tensor,
+        features: torch.Tensor,
+    ) -> Dict[str, Any]:
+        # Mirror whisper.transcribe's silence rule
+        if _is_silent(res):
+            return {"text": "", "language": res.language, "words": []}
+
+        words: List[Dict[str, Any]] = []
+        if request.get("word_timestamps"):
+            tokenizer = get_tokenizer(
+                model.is_multilingual,
+                num_languages=model.num_languages,
+                language=res.language,
+                task="transcribe",
+            )
+            text_tokens = [t for t in res.tokens if t < tokenizer.eot]
+            if text_tokens:
+                num_frames = min(len(request["audio"]) // HOP_LENGTH, N_FRAMES)
+                alignment = find_alignment(_EncodedModel(model, features), tokenizer, text_tokens, mel, num_frames)
+                merge_punctuations(alignment, PREPEND_PUNCTUATIONS, APPEND_PUNCTUATIONS)
+                words = [
+                    {
+                        "word": w.word,
+                        "start": round(float(w.start), 3),
+                        "end": round(float(w.end), 3),
+                        "probability": float(w.probability),
+                    }
+                    for w in alignment
+                    if w.word
+                ]
+        return {"text": res.text.strip(), "language": res.language, "words": words}
+
+    async def transcribe_long(
+        self,
+        audio: np.ndarray,
+        language: Optional[str] = None,
+        word_timestamps: bool = False,
+        on_segments: Optional[Callable[[List[Dict[str, Any]], int, int], None]] = None,
+    ) -> Dict[str, Any]:
+        """Transcribe audio of any length as independent pause-aligned chunks.
+
+        With the process backend (INFERENCE_BACKEND=process) chunk groups are
+        spread over the inference pool's workers. With the default thread
+        backend they go through this model's one batcher, so a single thread
+        decodes batch after batch and only torch's intra-op threads run in
+        parallel. `on_segments(segments, done, total)` is called as each group
+        of chunks completes, in completion order.
+        """
+        chunks = await asyncio.to_thread(vad.split, audio, N_SAMPLES)
+        # Chunks either side of a forced cut are aligned so stitching can compare word timings
+        at_cut = {i for i in range(len(chunks) - 1) if chunks[i][1] >= chunks[i + 1][0]}
+        at_cut |= {i + 1 for i in at_cut}
+        requests = [
+            {"audio": audio[start:end], "language": language, "word_timestamps": word_timestamps or i in at_cut}
+            for i, (start, end) in enumerate(chunks)
+        ]
+
+        def public(seg: Dict[str, Any]) -> Dict[str, Any]:
+            if word_timestamps or "words" not in seg:
+                return seg
+            return {k: v for k, v in seg.items() if k != "words"}
+        pool = get_inference_pool()
+        group_size = settings.stt_batch_max_size
+        if pool is not None:
+            # Smaller groups so every worker gets a share of a long file
+            group_size = max(1, min(group_size, math.ceil(len(requests) / pool.workers)))
+        groups = [list(range(i, min(i + group_size, len(requests)))) for i in range(0, len(requests), group_size)]
+
+        async def run_group(idx: List[int]) -> Tuple[List[int], List[Dict[str, Any]]]:
+            batch = [requests[i] for i in idx]
+            if pool is not None:
+                return idx, await self._dispatch_batch(batch)
+            return idx, await asyncio.gather(*[self._batcher.submit(r) for r in batch])
+
+        segments: List[Optional[Dict[str, Any]]] = [None] * len(chunks)
+        done = 0
+        for next_group in asyncio.as_completed([run_group(g) for g in groups]):
+            idx, results = await next_group
+            for i, result in zip(idx, results):
+                segments[i] = _to_segment(chunks[i], result)
+            done += len(idx)
+            if on_segments is not None:
+                on_segments([public(segments[i]) for i in idx if segments[i]["text"]], done, len(chunks))
+
+        spoken = [seg for seg in segments if seg["text"]]
+        speech = sum(end - start for start, end in chunks) / SAMPLE_RATE
+        return {
+            "text": _stitch(spoken),
+            "segments": [public(seg) for seg in spoken],
+            "language": next((seg["language"] for seg in spoken), language),
+            "duration": round(len(audio) / SAMPLE_RATE, 2),
+            "speech_seconds": round(speech, 2),
+        }
+
+    async def transcribe_detailed(self, audio: np.ndarray, language: Optional[str] = None) -> Dict[str, Any]:
+        """Transcribe the speech in `audio` and report how much silence VAD dropped"""
+        result = await self.transcribe_long(audio, language=language)
+        return {
+            "text": result["text"],
+            "language": result["language"],
+            "vad": {
+                "speech_seconds": result["speech_seconds"],
+                "dropped_seconds": round(result["duration"] - result["speech_seconds"], 2),
+            },
+        }
+
+    async def transcribe_array(self, audio: np.ndarray, language: Optional[str] = None) -> str:
+        """Transcribe 16 kHz mono float32 samples"""
+        result = await self.transcribe_detailed(audio, language=language)
+        return result["text"]
+
+    async def transcribe_bytes(self, data: bytes, language: Optional[str] = None) -> str:
+        """Decode an encoded audio file from memory and transcribe it"""
+        audio = await asyncio.to_thread(decode_audio_bytes, data)
+        return await self.transcribe_array(audio, language=language)
 
     async def transcribe_file(self, audio_path: str, language: Optional[str] = None) -> str:
-        def _transcribe() -> str:
-            result = self._model.transcribe(audio_path, language=language)
-            return result.get("text", "").strip()
+        data = await asyncio.to_thread(Path(audio_path).read_bytes)
+        return await self.transcribe_bytes(data, language=language)
+
+    async def transcribe_window(
+        self,
+        audio: np.ndarray,
+        language: Optional[str] = None,
+        prompt: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Transcribe a window of at most 30 s with word-level timestamps"""
+        return await self._batcher.submit({
+            "audio": audio,
+            "language": language,
+            "prompt": prompt,
+            "word_timestamps": True,
+        })
+
+
+# Entry points executed inside inference pool workers
+
+def _pool_run_batch(arrays: List[np.ndarray], model_name: str, options: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    requests = [{**opts, "audio": audio} for audio, opts in zip(arrays, options)]
+    return get_stt_service(model_name)._run_batch(requests)
+
+
+@lru_cache(maxsize=None)
+def get_stt_service(model_name: str = "base") -> WhisperSTTService:
+    """Shared service per model so concurrent routers batch together"""
+    return WhisperSTTService(model_name=model_name)
+
+
+def stt_service_for(language: Optional[str], model_name: str = "base") -> WhisperSTTService:
+    """Service for the language-specific variant of `model_name` (base -> base.en)"""
+    if language is None or not settings.stt_language_routing:
+        return get_stt_service(model_name)
+    return get_stt_service(LanguageDetectionService.get_whisper_model(language, model_name))
 
-        return await asyncio.to_thread(_transcribe)
 
+async def route_by_language(
+    audio: np.ndarray,
+    language: Optional[str] = None,
+    model_name: str = "base",
+) -> Tuple[WhisperSTTService, Optional[str]]:
+    """Service and language to transcribe `audio` with.
 
+    Without a language hint, the multilingual `model_name` identifies the
+    language from the first seconds of speech; a confident result selects
+    the language's own model and is passed on so it is not detected again.
+    Clips no longer than the detection window, or with an unsure result,
+    are transcribed by `model_name` with Whisper's per-chunk detection.
+    """
+    window = settings.lang_detect_audio_seconds * SAMPLE_RATE
+    if language is None and settings.stt_language_routing and len(audio) > window:
+        detected = await get_stt_service(model_name).detect_language(audio)
+        if detected["language"] and detected["confidence"] >= settings.lang_detect_audio_min_confidence:
+            language = detected["language"]
+    return stt_service_for(language, model_name), language
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from ..core.config import settings
+from .redis_service import get_redis
+
+
+class TranscriptionCache:
+    """Two-tier transcript cache keyed by a digest of the decoded PCM.
+
+    Only uploads that decode to identical samples share an entry: the same
+    file re-sent (under any name) hits, while a re-encode through a lossy
+    codec decodes to different PCM and misses.
+
+    Tier one is an in-process LRU. Tier two is Redis: each entry is a key with a
+    TTL, and a sorted set of last-access times bounds the number of entries
+    by evicting the least recently used ones.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        redis_max_entries: int = 50000,
+        ttl_seconds: int = 86400,
+        prefix: str = "stt_cache",
+    ) -> None:
+        self.max_entries = max_entries
+        self.redis_max_entries = redis_max_entries
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        self._local: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = get_redis()
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(audio: np.ndarray, model_name: str, language: Optional[str]) -> str:
+        digest = hashlib.sha256(memoryview(np.ascontiguousarray(audio, dtype=np.float32)))
+        digest.update(f"|{model_name}|{language or ''}".encode())
+        return digest.hexdigest()
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            value = self._local.get(key)
+            if value is not None:
+                self._local.move_to_end(key)
+                self.local_hits += 1
+                return value
+
+        try:
+            raw = await self._redis.get(self._redis_key(key))
+            if raw is not None:
+                # Expiry slides with use, so an index score is always expiry - ttl
+                async with self._redis.pipeline(transaction=False) as pipe:
+                    pipe.expire(self._redis_key(key), self.ttl_seconds)
+                    pipe.zadd(f"{self.prefix}:index", {key: time.time()})
+                    await pipe.execute()
+        except Exception as e:
+            print(f"Transcription cache error: {e}")
+            raw = None
+
+        if raw is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        value = json.loads(raw)
+        with self._lock:
+            self.redis_hits += 1
+        self._remember(key, value)
+        return value
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        self._remember(key, value)
+        index = f"{self.prefix}:index"
+        try:
+            now = time.time()
+            async with self._redis.pipeline(transaction=False) as pipe:
+                pipe.set(self._redis_key(key), json.dumps(value), ex=self.ttl_seconds)
+                pipe.zadd(index, {key: now})
+                # Members whose keys already expired by TTL would otherwise count towards the cap
+                pipe.zremrangebyscore(index, "-inf", f"({now - self.ttl_seconds}")
+                pipe.zcard(index)
+                size = (await pipe.execute())[-1]
+            excess = size - self.redis_max_entries
+            if excess > 0:
+                evicted = await self._redis.zpopmin(index, excess)
+                if evicted:
+                    await self._redis.delete(*[self._redis_key(k) for k, _ in evicted])
+        except Exception as e:
+            print(f"Transcription cache error: {e}")
+
+    def _remember(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._local[key] = value
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_entries:
+                self._local.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self.local_hits + self.redis_hits
+            lookups = hits + self.misses
+            return {
+                "local_hits": self.local_hits,
+                "redis_hits": self.redis_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "local_entries": len(self._local),
+            }
+
+
+stt_cache = TranscriptionCache(
+    max_entries=settings.stt_cache_max_entries,
+    redis_max_entries=settings.stt_cache_redis_max_entries,
+    ttl_seconds=settings.stt_cache_ttl_seconds,
+)
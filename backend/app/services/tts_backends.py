@@ -0,0 +1,154 @@
+import asyncio
+import io
+import threading
+import wave
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional
+
+from ..core.config import settings
+from .model_registry import model_registry
+
+
+class TTSBackend(ABC):
+    """A speech engine that turns text into encoded audio for a voice like "en-US" """
+
+    name: str = ""
+    audio_format: str = "mp3"
+    media_type: str = "audio/mpeg"
+
+    def supports(self, voice: str) -> bool:
+        return True
+
+    @abstractmethod
+    def synthesize(self, text: str, voice: str, slow: bool = False) -> bytes:
+        ...
+
+    async def synthesize_async(self, text: str, voice: str, slow: bool = False) -> bytes:
+        return await asyncio.to_thread(self.synthesize, text, voice, slow)
+
+
+# Accent-specific Google TTS hosts; voices not listed use the default host
+_GTTS_TLDS = {
+    "en-GB": "co.uk",
+    "en-AU": "com.au",
+    "en-IN": "co.in",
+    "es-ES": "es",
+    "es-MX": "com.mx",
+    "fr-FR": "fr",
+    "fr-CA": "ca",
+    "pt-PT": "pt",
+    "pt-BR": "com.br",
+}
+
+
+class GTTSBackend(TTSBackend):
+    """Google Translate TTS; one network round trip per request"""
+
+    name = "gtts"
+
+    def synthesize(self, text: str, voice: str, slow: bool = False) -> bytes:
+        from gtts import gTTS
+
+        lang = voice if voice.startswith("zh") else voice.split("-")[0]
+        buf = io.BytesIO()
+        gTTS(text=text, lang=lang, tld=_GTTS_TLDS.get(voice, "com"), slow=slow).write_to_fp(buf)
+        return buf.getvalue()
+
+
+def load_piper_voice(model_path: str):
+    from piper import PiperVoice
+
+    return PiperVoice.load(model_path)
+
+
+model_registry.register_loader("piper", load_piper_voice)
+
+# espeak-ng keeps global state, so phonemization is serialized; ONNX inference is not
+_PHONEMIZE_LOCK = threading.Lock()
+
+
+class PiperBackend(TTSBackend):
+    """Local offline engine (optional `piper-tts` extra, ONNX voices on disk).
+
+    Voices are looked up as `{voices_dir}/{en_US}-*.onnx`, loaded through the
+    model registry, and synthesized in-process on a dedicated thread pool of
+    TTS_PIPER_MAX_CONCURRENCY threads. Phonemization (espeak-ng) is serialized;
+    ONNX inference releases the GIL, so requests run in parallel without
+    oversubscribing the CPU, and queued ones do not hold threads of the
+    default executor.
+    """
+
+    name = "piper"
+    audio_format = "wav"
+    media_type = "audio/wav"
+
+    def __init__(self, voices_dir: Optional[str] = None) -> None:
+        self.voices_dir = Path(voices_dir or settings.tts_piper_voices_dir)
+        self._paths: Dict[str, Optional[Path]] = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, settings.tts_piper_max_concurrency),
+            thread_name_prefix="piper",
+        )
+
+    @staticmethod
+    def available() -> bool:
+        try:
+            import piper  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def model_path(self, voice: str) -> Optional[Path]:
+        if voice not in self._paths:
+            matches = sorted(self.voices_dir.glob(f"{voice.replace('-', '_')}-*.onnx"))
+            self._paths[voice] = matches[0] if matches else None
+        return self._paths[voice]
+
+    def supports(self, voice: str) -> bool:
+        return self.available() and self.model_path(voice) is not None
+
+    def synthesize(self, text: str, voice: str, slow: bool = False) -> bytes:
+        model = model_registry.get("piper", str(self.model_path(voice)))
+        with _PHONEMIZE_LOCK:
+            sentences = model.phonemize(text)
+        buf = io.BytesIO()
+        with wave.open(buf, "wb") as wav:
+            wav.setframerate(model.config.sample_rate)
+            wav.setsampwidth(2)
+            wav.setnchannels(1)
+            for phonemes in sentences:
+                ids = model.phonemes_to_ids(phonemes)
+                wav.writeframes(model.synthesize_ids_to_raw(ids, length_scale=1.4 if slow else None))
+        return buf.getvalue()
+
+    async def synthesize_async(self, text: str, voice: str, slow: bool = False) -> bytes:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.synthesize, text, voice, slow)
+
+
+_backends: Dict[str, TTSBackend] = {}
+
+
+def register_backend(backend: TTSBackend) -> None:
+    _backends[backend.name] = backend
+
+
+def get_backend(name: str) -> TTSBackend:
+    if name not in _backends:
+        raise KeyError(f"Unknown TTS backend '{name}'")
+    return _backends[name]
+
+
+def select_backend(voice: str) -> TTSBackend:
+    """First backend in TTS_BACKENDS order that can speak `voice`"""
+    for name in settings.tts_backends.split(","):
+        backend = _backends.get(name.strip())
+        if backend is not None and backend.supports(voice):
+            return backend
+    return _backends["gtts"]
+
+
+register_backend(GTTSBackend())
+register_backend(PiperBackend())
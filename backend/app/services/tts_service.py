@@ -1,22 +1,285 @@
 import asyncio
+import hashlib
+import io
+import json
+import os
+import re
+import struct
+import threading
+import time
+import uuid
+import wave
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
-from gtts import gTTS
+from ..core.config import settings
+from .lang_detect_service import LanguageDetectionService
+from .tts_backends import TTSBackend, select_backend
+
+
+_SENTENCE_END = re.compile(r"(?<=[.!?;\u3002\uff01\uff1f])\s+")
+_CLAUSE_END = re.compile(r"(?<=[,:])\s+")
+
+
+def split_sentences(text: str, max_chars: int = 300) -> List[str]:
+    """Split text into sentences, breaking overlong ones at clauses or words"""
+    sentences: List[str] = []
+    for sentence in _SENTENCE_END.split(text.strip()):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if len(sentence) <= max_chars:
+            sentences.append(sentence)
+            continue
+        chunk = ""
+        for part in _CLAUSE_END.split(sentence):
+            for word in part.split() if len(part) > max_chars else [part]:
+                if chunk and len(chunk) + len(word) + 1 > max_chars:
+                    sentences.append(chunk)
+                    chunk = ""
+                chunk = f"{chunk} {word}" if chunk else word
+        if chunk:
+            sentences.append(chunk)
+    return sentences
+
+
+def _wav_stream_chunk(data: bytes, first: bool) -> bytes:
+    """Re-frame a sentence WAV for a continuous stream.
+
+    The first chunk keeps a header whose sizes are set to the maximum (length
+    unknown while streaming); later chunks carry only their PCM frames.
+    """
+    with wave.open(io.BytesIO(data), "rb") as wav:
+        params = wav.getparams()
+        frames = wav.readframes(params.nframes)
+    if not first:
+        return frames
+    header = io.BytesIO()
+    with wave.open(header, "wb") as out:
+        out.setparams(params)
+    header = bytearray(header.getvalue())
+    header[4:8] = struct.pack("<I", 0xFFFFFFFF)
+    header[-4:] = struct.pack("<I", 0xFFFFFFFF)
+    return bytes(header) + frames
+
+
+def _concat_wav(parts: List[bytes]) -> Tuple[List[bytes], bytes]:
+    """Join sentence WAVs into one file; returns the PCM of each part and the file"""
+    if not parts:
+        return [], b""
+    frames, params = [], None
+    for data in parts:
+        with wave.open(io.BytesIO(data), "rb") as wav:
+            params = params or wav.getparams()
+            frames.append(wav.readframes(wav.getnframes()))
+    out = io.BytesIO()
+    with wave.open(out, "wb") as wav:
+        wav.setparams(params)
+        wav.writeframes(b"".join(frames))
+    return frames, out.getvalue()
 
 
 class TTSService:
-    def __init__(self, output_dir: str = ".cache/tts") -> None:
+    """Speech synthesis behind a persistent content-addressed file cache.
+
+    The engine is chosen per voice from the registered TTS backends. Files are
+    named by a SHA-256 digest of the text, backend, voice and speed, so the
+    name is stable across restarts and workers. The in-memory index (size,
+    last access) is rebuilt from the directory, and file mtimes double as the
+    shared last-access time. When the directory grows past the quota, least
+    recently used files are removed. Concurrent requests for the same audio
+    share a single synthesis.
+    """
+
+    def __init__(self, output_dir: str = ".cache/tts", max_bytes: Optional[int] = None) -> None:
         self.output_path = Path(output_dir)
         self.output_path.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes if max_bytes is not None else settings.tts_cache_max_mb * 1024 * 1024
+        self._lock = threading.Lock()
+        self._index: Dict[str, Tuple[int, float]] = {}
+        self._total = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self._rescan()
+
+    @staticmethod
+    def voice_for(lang: str) -> str:
+        """Accept a voice ("en-GB") as is and map known language codes to their
+        voice; other bare codes ("nl", "hi") pass through for gTTS to speak"""
+        return lang if "-" in lang else LanguageDetectionService.get_tts_voice(lang, default=lang)
+
+    def backend_for(self, lang: str) -> TTSBackend:
+        return select_backend(self.voice_for(lang))
+
+    @staticmethod
+    def cache_key(text: str, backend: str, voice: str, slow: bool = False) -> str:
+        payload = json.dumps({"text": text, "backend": backend, "voice": voice, "slow": slow}, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    async def synthesize_to_file(self, text: str, lang: str = "en", slow: bool = False) -> str:
+        voice = self.voice_for(lang)
+        backend = select_backend(voice)
+        key = self.cache_key(text, backend.name, voice, slow)
+        path = self.output_path / f"tts_{key}.{backend.audio_format}"
+        if self._lookup(path):
+            return str(path)
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._render(path, backend, text, voice, slow))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shielded so one cancelled caller does not cancel the shared synthesis
+        return await asyncio.shield(task)
+
+    async def stream(
+        self,
+        text: str,
+        lang: str = "en",
+        slow: bool = False,
+        concurrency: Optional[int] = None,
+    ) -> AsyncIterator[bytes]:
+        """Yield audio sentence by sentence, in order.
+
+        Sentences are synthesized concurrently (bounded by `concurrency`), so
+        the first chunk is ready after one sentence rather than the whole text.
+        MP3 frames concatenate as they are; WAV sentences are re-framed into a
+        single header followed by PCM.
+        """
+        limit = asyncio.Semaphore(concurrency or settings.tts_stream_concurrency)
+        is_wav = self.backend_for(lang).audio_format == "wav"
+
+        async def render(sentence: str) -> bytes:
+            async with limit:
+                path = await self.synthesize_to_file(sentence, lang, slow)
+                return await asyncio.to_thread(Path(path).read_bytes)
+
+        tasks = [asyncio.ensure_future(render(s)) for s in split_sentences(text)]
+        try:
+            for i, task in enumerate(tasks):
+                data = await task
+                yield _wav_stream_chunk(data, first=i == 0) if is_wav else data
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def document_digest(self, text: str, lang: str = "en") -> str:
+        """Identifies a rendering of `text`: changes with the text, voice or engine"""
+        voice = self.voice_for(lang)
+        return self.cache_key(text, select_backend(voice).name, voice)
+
+    async def render_document(self, text: str, lang: str = "en") -> Tuple[bytes, List[Dict[str, Any]]]:
+        """Render a whole text as one audio file, returning it with a sentence manifest.
+
+        Each sentence goes through the cache on its own, so re-rendering an
+        edited document only synthesizes the sentences that changed.
+        """
+        limit = asyncio.Semaphore(settings.tts_stream_concurrency)
+        sentences = split_sentences(text)
+
+        async def render(sentence: str) -> bytes:
+            async with limit:
+                path = await self.synthesize_to_file(sentence, lang)
+                return await asyncio.to_thread(Path(path).read_bytes)
+
+        parts = await asyncio.gather(*(render(s) for s in sentences))
+        if self.backend_for(lang).audio_format == "wav":
+            parts, audio = _concat_wav(parts)
+        else:
+            audio = b"".join(parts)
+        # Offsets index the stored file, so they start after any container header
+        manifest, offset = [], len(audio) - sum(len(part) for part in parts)
+        for sentence, part in zip(sentences, parts):
+            manifest.append({"text": sentence, "offset": offset, "bytes": len(part)})
+            offset += len(part)
+        return audio, manifest
+
+    def _lookup(self, path: Path) -> bool:
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return False
+        now = time.time()
+        try:
+            os.utime(path, (now, now))
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+            if path.name not in self._index:
+                self._total += size
+            self._index[path.name] = (size, now)
+        return True
+
+    async def _render(self, path: Path, backend: TTSBackend, text: str, voice: str, slow: bool) -> str:
+        data = await backend.synthesize_async(text, voice, slow)
+        return await asyncio.to_thread(self._store, path, data)
+
+    def _store(self, path: Path, data: bytes) -> str:
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.{uuid.uuid4().hex}.tmp")
+        try:
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+        with self._lock:
+            previous = self._index.get(path.name)
+            self._total += len(data) - (previous[0] if previous else 0)
+            self._index[path.name] = (len(data), time.time())
+            over_quota = self.max_bytes and self._total > self.max_bytes
+        if over_quota:
+            self._evict()
+        return str(path)
+
+    def _rescan(self) -> None:
+        """Rebuild the index from disk; other workers write to the same directory"""
+        index: Dict[str, Tuple[int, float]] = {}
+        for entry in os.scandir(self.output_path):
+            if entry.name.startswith("tts_") and not entry.name.endswith(".tmp"):
+                st = entry.stat()
+                index[entry.name] = (st.st_size, st.st_mtime)
+        with self._lock:
+            self._index = index
+            self._total = sum(size for size, _ in index.values())
 
-    async def synthesize_to_file(self, text: str, lang: str = "en") -> str:
-        def _synthesize() -> str:
-            tts = gTTS(text=text, lang=lang)
-            file_path = self.output_path / f"tts_{abs(hash(text+lang))}.mp3"
-            tts.save(str(file_path))
-            return str(file_path)
+    def _evict(self) -> None:
+        self._rescan()
+        with self._lock:
+            if self._total <= self.max_bytes:
+                return
+            # Evict down to 90% of the quota so we do not evict on every write
+            target = self.max_bytes * 0.9
+            victims: List[str] = []
+            total = self._total
+            for name, (size, _) in sorted(self._index.items(), key=lambda kv: kv[1][1]):
+                if total <= target:
+                    break
+                victims.append(name)
+                total -= size
+        for name in victims:
+            (self.output_path / name).unlink(missing_ok=True)
+        with self._lock:
+            for name in victims:
+                size, _ = self._index.pop(name, (0, 0.0))
+                self._total -= size
 
-        return await asyncio.to_thread(_synthesize)
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._index),
+                "size_mb": round(self._total / (1024 * 1024), 1),
+                "quota_mb": round(self.max_bytes / (1024 * 1024), 1),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
 
 
+@lru_cache
+def get_tts_service() -> TTSService:
+    return TTSService()
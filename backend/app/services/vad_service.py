@@ -0,0 +1,138 @@
+import threading
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from .audio_io import SAMPLE_RATE
+
+
+def _runs(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Start and end (exclusive) indices of the True runs in a boolean array"""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+class VoiceActivityDetector:
+    """Energy + spectral-flatness voice activity detector.
+
+    Audio is cut into fixed frames; a frame is speech when its level clears an
+    adaptive noise-floor threshold and its spectrum is peaky (low flatness)
+    rather than noise-like. Short gaps are bridged, blips shorter than
+    `min_speech_ms` are dropped and regions are padded on both sides.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = SAMPLE_RATE,
+        frame_ms: int = 20,
+        min_energy_db: float = -50.0,
+        snr_db: float = 10.0,
+        max_flatness: float = 0.3,
+        min_speech_ms: int = 120,
+        min_silence_ms: int = 300,
+        pad_ms: int = 150,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.frame = int(sample_rate * frame_ms / 1000)
+        self.min_energy_db = min_energy_db
+        self.snr_db = snr_db
+        self.max_flatness = max_flatness
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.min_silence_frames = max(1, min_silence_ms // frame_ms)
+        self.pad_frames = pad_ms // frame_ms
+        self._window = np.hanning(self.frame).astype(np.float32)
+        self._lock = threading.Lock()
+        self.processed_seconds = 0.0
+        self.dropped_seconds = 0.0
+
+    def _frame_features(self, audio: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        n = len(audio) // self.frame
+        frames = audio[:n * self.frame].reshape(n, self.frame)
+        energy_db = 10.0 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+        power = np.abs(np.fft.rfft(frames * self._window, axis=1)) ** 2 + 1e-10
+        flatness = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+        return energy_db, flatness
+
+    def speech_mask(self, audio: np.ndarray) -> np.ndarray:
+        """One boolean per frame, True where speech is present"""
+        energy_db, flatness = self._frame_features(audio)
+        if len(energy_db) == 0:
+            return np.zeros(0, dtype=bool)
+        # Noise floor from the quietest frames, capped so all-speech clips still pass
+        floor = np.percentile(energy_db, 10) + self.snr_db
+        threshold = max(self.min_energy_db, min(floor, np.percentile(energy_db, 90) - 15.0))
+        mask = (energy_db > threshold) & (flatness < self.max_flatness)
+
+        starts, ends = _runs(~mask)
+        for s, e in zip(starts, ends):
+            if s > 0 and e < len(mask) and e - s < self.min_silence_frames:
+                mask[s:e] = True
+        starts, ends = _runs(mask)
+        for s, e in zip(starts, ends):
+            if e - s < self.min_speech_frames:
+                mask[s:e] = False
+        if self.pad_frames and mask.any():
+            kernel = np.ones(2 * self.pad_frames + 1)
+            mask = np.convolve(mask.astype(np.float32), kernel, mode="same") > 0
+        return mask
+
+    def speech_regions(self, audio: np.ndarray) -> List[Tuple[int, int]]:
+        """Speech regions as (start, end) sample indices"""
+        starts, ends = _runs(self.speech_mask(audio))
+        return [(int(s) * self.frame, min(int(e) * self.frame, len(audio))) for s, e in zip(starts, ends)]
+
+    def has_speech(self, audio: np.ndarray) -> bool:
+        return bool(self.speech_mask(audio).any())
+
+    def trim(self, audio: np.ndarray) -> Tuple[int, int]:
+        """Bounds of `audio` with leading and trailing silence removed; (0, 0) if silent"""
+        regions = self.speech_regions(audio)
+        if not regions:
+            return 0, 0
+        return regions[0][0], regions[-1][1]
+
+    def split(self, audio: np.ndarray, max_samples: int) -> List[Tuple[int, int]]:
+        """Group speech into chunks of at most `max_samples`, cutting at pauses.
+
+        Silence between chunks is dropped. A single region longer than the
+        limit is cut at its quietest frame near the limit.
+        """
+        chunks: List[Tuple[int, int]] = []
+        for start, end in self.speech_regions(audio):
+            while end - start > max_samples:
+                cut = self._quietest_cut(audio, start, start + max_samples)
+                chunks.append((start, cut))
+                start = cut
+            if chunks and end - chunks[-1][0] <= max_samples:
+                chunks[-1] = (chunks[-1][0], end)
+            else:
+                chunks.append((start, end))
+        self.record(len(audio), sum(e - s for s, e in chunks))
+        return chunks
+
+    def _quietest_cut(self, audio: np.ndarray, start: int, limit: int) -> int:
+        # Search the last quarter of the chunk so pieces stay close to the limit
+        search_from = start + (limit - start) * 3 // 4
+        n = (limit - search_from) // self.frame
+        if n <= 0:
+            return limit
+        frames = audio[search_from:search_from + n * self.frame].reshape(n, self.frame)
+        quietest = int(np.argmin(np.mean(frames ** 2, axis=1)))
+        return search_from + quietest * self.frame + self.frame // 2
+
+    def record(self, total_samples: int, kept_samples: int) -> None:
+        with self._lock:
+            self.processed_seconds += total_samples / self.sample_rate
+            self.dropped_seconds += max(total_samples - kept_samples, 0) / self.sample_rate
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            processed, dropped = self.processed_seconds, self.dropped_seconds
+        return {
+            "processed_seconds": round(processed, 1),
+            "dropped_seconds": round(dropped, 1),
+            "dropped_ratio": round(dropped / processed, 3) if processed else 0.0,
+        }
+
+
+vad = VoiceActivityDetector()
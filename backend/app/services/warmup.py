@@ -0,0 +1,142 @@
+import asyncio
+import time
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..core.config import settings
+from .audio_io import SAMPLE_RATE
+from .inference_pool import get_inference_pool
+from .model_registry import parse_model_list
+
+
+class Readiness:
+    """Startup progress reported by /ready; liveness (/health) does not depend on it.
+
+    The worker is ready once every preloaded model matched by READY_REQUIRES
+    is warm; other preloads are best effort and keep retrying in the background.
+    """
+
+    def __init__(self) -> None:
+        self.ready = False
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.models: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def required(key: str) -> bool:
+        """Whether the preload `key` ("kind:name") gates readiness"""
+        spec = [r.strip() for r in settings.ready_requires.split(",") if r.strip()]
+        return not spec or key in spec or key.split(":", 1)[0] in spec
+
+    def update(self) -> None:
+        # A skipped preload (no warm-up for its kind) never loads, so it cannot gate readiness
+        self.ready = all(
+            m["status"] in ("ready", "skipped")
+            for key, m in self.models.items()
+            if self.required(key)
+        )
+        if self.ready and self.finished_at is None:
+            self.finished_at = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "warmup_seconds": round(self.finished_at - self.started_at, 2) if self.finished_at and self.started_at else None,
+            "models": {key: {**m, "required": self.required(key)} for key, m in self.models.items()},
+        }
+
+
+readiness = Readiness()
+
+
+def _warmup_audio(seconds: float = 1.0) -> np.ndarray:
+    # Quiet noise rather than silence, so the full decode path runs
+    rng = np.random.default_rng(0)
+    return (rng.standard_normal(int(seconds * SAMPLE_RATE)) * 0.01).astype(np.float32)
+
+
+async def _warm_whisper(name: str) -> None:
+    from .stt_whisper_service import get_stt_service
+
+    # Goes through the micro-batcher, which loads the model on first use
+    await get_stt_service(name).transcribe_window(_warmup_audio(), language="en")
+
+
+async def _warm_speaker(name: str) -> None:
+    from .speaker_id_service import SpeakerIdService
+
+    svc = await asyncio.to_thread(SpeakerIdService, name)
+    await svc.embed_many([_warmup_audio()])
+
+
+_WARMERS: Dict[str, Callable[[str], Awaitable[None]]] = {
+    "whisper": _warm_whisper,
+    "speaker": _warm_speaker,
+}
+
+
+async def _warm(key: str, load: Callable[[], Awaitable[None]], lock: asyncio.Lock) -> None:
+    """Load one model, retrying with exponential backoff until it succeeds"""
+    delay = settings.warmup_retry_initial_seconds
+    attempt = 0
+    while True:
+        attempt += 1
+        # One load at a time, so preloads do not compete for memory and CPU
+        async with lock:
+            readiness.models[key] = {"status": "loading", "attempts": attempt}
+            started = time.perf_counter()
+            try:
+                await load()
+            except Exception as e:
+                print(f"Warm-up failed for {key} (attempt {attempt}, retrying in {delay:.0f} s): {e}")
+                readiness.models[key] = {"status": "failed", "error": str(e), "attempts": attempt, "retry_in": delay}
+            else:
+                readiness.models[key] = {
+                    "status": "ready",
+                    "seconds": round(time.perf_counter() - started, 2),
+                    "attempts": attempt,
+                }
+                readiness.update()
+                return
+        readiness.update()
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, settings.warmup_retry_max_seconds)
+
+
+async def warm_up() -> None:
+    """Start the inference pool, load the INFERENCE_PRELOAD models and run one
+    dummy inference through each, and load the SPACY_PRELOAD pipelines.
+
+    Failed loads are retried with backoff for as long as the worker runs;
+    readiness only waits for the ones READY_REQUIRES names.
+    """
+    readiness.started_at = time.time()
+    pool = get_inference_pool()
+    if pool is not None:
+        try:
+            await asyncio.to_thread(pool.start)
+        except Exception as e:
+            # Workers are spawned again on the first call
+            print(f"Inference pool failed to start: {e}")
+
+    jobs: List[Tuple[str, Callable[[], Awaitable[None]]]] = []
+    for kind, name in parse_model_list(settings.inference_preload):
+        key = f"{kind}:{name}"
+        warmer = _WARMERS.get(kind)
+        if warmer is None:
+            readiness.models[key] = {"status": "skipped", "error": "no warm-up for this model kind"}
+            continue
+        jobs.append((key, partial(warmer, name)))
+
+    if settings.spacy_preload:
+        from .lang_detect_service import LanguageDetectionService
+
+        jobs.append((f"spacy:{settings.spacy_preload}", partial(asyncio.to_thread, LanguageDetectionService.preload)))
+
+    for key, _ in jobs:
+        readiness.models[key] = {"status": "pending"}
+    readiness.update()
+    lock = asyncio.Lock()
+    await asyncio.gather(*(_warm(key, load, lock) for key, load in jobs))
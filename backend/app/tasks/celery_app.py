@@ -6,6 +6,7 @@ celery_app = Celery(
     "voiceflow",
     broker=settings.redis_url,
     backend=settings.redis_url,
+    include=["app.tasks.transcription", "app.tasks.content_audio", "app.tasks.nlu"],
 )
 
 celery_app.conf.update(task_acks_late=True, worker_prefetch_multiplier=1)
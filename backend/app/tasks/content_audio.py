@@ -0,0 +1,81 @@
+import asyncio
+import os
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import select
+
+from .celery_app import celery_app
+from .db import task_sessionmaker
+from ..models.content import Content
+
+
+CONTENT_AUDIO_DIR = Path(".cache/tts/content")
+
+
+async def _render(content_id: str) -> dict:
+    from ..services.tts_service import get_tts_service
+
+    tts = get_tts_service()
+    Session = task_sessionmaker()
+
+    async with Session() as db:
+        row = (await db.execute(select(Content).where(Content.id == content_id))).scalar_one_or_none()
+        if row is None:
+            return {"content_id": content_id, "status": "missing"}
+        body, lang = row.body, row.lang or "en"
+        digest = tts.document_digest(body, lang)
+        if row.audio_digest == digest and row.audio_status == "ready" and row.audio_path and os.path.exists(row.audio_path):
+            return {"content_id": content_id, "status": "unchanged"}
+        # The previous artifact keeps being served while this one renders
+        row.audio_render_status = "rendering"
+        await db.commit()
+
+    try:
+        audio, manifest = await tts.render_document(body, lang)
+    except Exception:
+        async with Session() as db:
+            row = await db.get(Content, row.id)
+            if row is not None and tts.document_digest(row.body, row.lang or "en") == digest:
+                row.audio_render_status = "failed"
+                await db.commit()
+        raise
+
+    ext = tts.backend_for(lang).audio_format
+    path = CONTENT_AUDIO_DIR / f"{content_id}_{digest[:16]}.{ext}"
+    await asyncio.to_thread(_write_atomic, path, audio)
+
+    async with Session() as db:
+        row = await db.get(Content, row.id)
+        # The body changed while rendering; the task queued by that edit wins
+        if row is None or tts.document_digest(row.body, row.lang or "en") != digest:
+            path.unlink(missing_ok=True)
+            return {"content_id": content_id, "status": "stale"}
+        previous = row.audio_path
+        row.audio_status = "ready"
+        row.audio_render_status = "ready"
+        row.audio_path = str(path)
+        row.audio_digest = digest
+        row.audio_manifest = manifest
+        row.audio_rendered_at = datetime.utcnow()
+        await db.commit()
+    if previous and previous != str(path):
+        Path(previous).unlink(missing_ok=True)
+    return {"content_id": content_id, "status": "ready", "sentences": len(manifest), "bytes": len(audio)}
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+@celery_app.task(name="content.render_audio")
+def render_content_audio(content_id: str) -> dict:
+    """Pre-render a content body to audio, reusing cached sentences"""
+    return asyncio.run(_render(content_id))
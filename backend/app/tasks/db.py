@@ -0,0 +1,21 @@
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from ..core.config import settings
+
+
+_engine: Optional[AsyncEngine] = None
+
+
+def task_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    """Sessions for Celery tasks.
+
+    Every task runs in a fresh event loop (asyncio.run), so pooled connections
+    bound to an earlier loop must not be reused; NullPool opens one per session.
+    """
+    global _engine
+    if _engine is None:
+        _engine = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+    return async_sessionmaker(bind=_engine, expire_on_commit=False)
@@ -0,0 +1,122 @@
+import json
+import time
+import uuid
+from typing import Optional
+
+import redis
+from sqlalchemy import select
+
+from .celery_app import celery_app
+from .db import task_sessionmaker
+from ..core.config import settings
+from ..models.workspace import Workspace
+from ..services.nlu_service import IntentMatcher, NLUService, vocabulary_from_settings
+
+
+COMMAND_LOG_KEY = "command_log"
+RESCORE_PAGE_SIZE = 5000
+
+# LSET only if the entry at the index is still the one that was scored
+_REPLACE_IF_UNCHANGED = """
+if redis.call('LINDEX', KEYS[1], ARGV[1]) == ARGV[2] then
+    redis.call('LSET', KEYS[1], ARGV[1], ARGV[3])
+    return 1
+end
+return 0
+"""
+
+_redis: Optional[redis.Redis] = None
+
+
+def _get_redis() -> redis.Redis:
+    global _redis
+    if _redis is None:
+        _redis = redis.Redis.from_url(settings.redis_url, decode_responses=True)
+    return _redis
+
+
+async def _load_matcher(workspace_id: Optional[str]) -> Optional[IntentMatcher]:
+    if not workspace_id:
+        return None
+    async with task_sessionmaker()() as db:
+        settings_json = (await db.execute(
+            select(Workspace.settings_json).where(Workspace.id == uuid.UUID(workspace_id))
+        )).scalar_one_or_none()
+    return IntentMatcher(vocabulary_from_settings(settings_json))
+
+
+@celery_app.task(name="nlu.rescore_command_log")
+def rescore_command_log(workspace_id: Optional[str] = None, limit: Optional[int] = None) -> dict:
+    """Re-run intent detection over the command log and write the results back in place.
+
+    Only entries logged for `workspace_id` are rescored, against that
+    workspace's vocabulary; without one, only entries logged with no
+    workspace are, against the defaults. `limit` caps the run to the newest
+    entries. The log is read newest-first from the head in pages and every
+    page is scored in one batch. Entries are addressed by negative
+    (tail-relative) indices, which stay valid while the voice sockets keep
+    LPUSHing new commands, and each write only lands if the entry is still
+    the one that was read. If the log is cleared mid-run the task stops.
+    """
+    import asyncio
+
+    started = time.perf_counter()
+    r = _get_redis()
+    nlu = NLUService()
+    matcher = asyncio.run(_load_matcher(workspace_id))
+    replace = r.register_script(_REPLACE_IF_UNCHANGED)
+
+    length = r.llen(COMMAND_LOG_KEY)
+    total = min(length, limit) if limit else length
+    rescored = changed = 0
+    interrupted = None
+    # Walk from the head (newest) towards the tail, one page at a time
+    for offset in range(0, total, RESCORE_PAGE_SIZE):
+        first = offset - length
+        last = min(offset + RESCORE_PAGE_SIZE, total) - 1 - length
+        raw = r.lrange(COMMAND_LOG_KEY, first, last)
+        if not raw:
+            interrupted = "command log was cleared"
+            break
+        entries, indices, originals = [], [], []
+        for i, item in enumerate(raw):
+            try:
+                entry = json.loads(item)
+            except ValueError:
+                continue
+            if not isinstance(entry, dict) or not entry.get("text"):
+                continue
+            # Entries from other workspaces were scored against a different vocabulary
+            if str(entry.get("workspace_id") or "").lower() != str(workspace_id or "").lower():
+                continue
+            entries.append(entry)
+            indices.append(first + i)
+            originals.append(item)
+
+        results = nlu.detect_intents([e["text"] for e in entries], matcher)
+        flips = []
+        try:
+            with r.pipeline(transaction=False) as pipe:
+                for index, original, entry, result in zip(indices, originals, entries, results):
+                    flips.append((entry.get("intent") or {}).get("intent") != result["intent"])
+                    entry["intent"] = result
+                    entry["rescored_at"] = time.time()
+                    replace(keys=[COMMAND_LOG_KEY], args=[index, original, json.dumps(entry)], client=pipe)
+                written = pipe.execute()
+        except redis.ResponseError as e:
+            interrupted = str(e)
+            break
+        rescored += sum(1 for ok in written if ok)
+        changed += sum(1 for ok, flip in zip(written, flips) if ok and flip)
+        if not all(written):
+            # Entries that vanished were cleared, or trimmed, while the page was scored
+            interrupted = "command log changed during rescore"
+            break
+
+    return {
+        "rescored": rescored,
+        "changed": changed,
+        "workspace_id": workspace_id,
+        "interrupted": interrupted,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
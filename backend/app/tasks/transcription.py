@@ -0,0 +1,91 @@
+import asyncio
+import json
+import time
+from typing import Optional
+
+import redis
+
+from .celery_app import celery_app
+from ..core.config import settings
+from ..services.audio_io import decode_audio_bytes
+
+
+JOB_TTL_SECONDS = 86400
+
+
+def job_key(job_id: str) -> str:
+    return f"stt_job:{job_id}"
+
+
+def job_audio_key(job_id: str) -> str:
+    return f"stt_job:{job_id}:audio"
+
+
+def job_segments_key(job_id: str) -> str:
+    return f"stt_job:{job_id}:segments"
+
+
+def job_events_channel(user_id: str) -> str:
+    return f"stt_jobs:{user_id}"
+
+
+_redis: Optional[redis.Redis] = None
+
+
+def _get_redis() -> redis.Redis:
+    # Binary-safe sync client: the job audio is stored as raw bytes
+    global _redis
+    if _redis is None:
+        _redis = redis.Redis.from_url(settings.redis_url)
+    return _redis
+
+
+def _publish(r: redis.Redis, user_id: str, event: dict) -> None:
+    if user_id:
+        r.publish(job_events_channel(user_id), json.dumps(event))
+
+
+@celery_app.task(name="stt.transcribe_job")
+def transcribe_job(job_id: str, model_name: str = "base", language: Optional[str] = None) -> None:
+    """Transcribe an uploaded recording, streaming segments and progress into Redis"""
+    from ..services.stt_whisper_service import route_by_language
+
+    r = _get_redis()
+    key = job_key(job_id)
+    segments_key = job_segments_key(job_id)
+    user_id = (r.hget(key, "user_id") or b"").decode()
+
+    # Re-deliveries (acks_late) start over from a clean segment list
+    r.delete(segments_key)
+    r.hset(key, mapping={"status": "running", "progress": 0, "started_at": time.time()})
+    try:
+        data = r.get(job_audio_key(job_id))
+        if data is None:
+            raise RuntimeError("Job audio expired before transcription started")
+        audio = decode_audio_bytes(data)
+
+        def on_segments(segments: list, done: int, total: int) -> None:
+            pipe = r.pipeline()
+            for seg in segments:
+                pipe.rpush(segments_key, json.dumps(seg))
+            pipe.hset(key, "progress", round(done / total, 3))
+            pipe.execute()
+
+        async def transcribe() -> dict:
+            svc, routed = await route_by_language(audio, language, model_name)
+            if routed:
+                r.hset(key, mapping={"language": routed, "model": svc.model_name})
+            return await svc.transcribe_long(audio, language=routed, on_segments=on_segments)
+
+        result = asyncio.run(transcribe())
+        text = result["text"]
+        r.hset(key, mapping={"status": "completed", "progress": 1, "text": text, "finished_at": time.time()})
+        r.delete(job_audio_key(job_id))
+        _publish(r, user_id, {"type": "stt_job_completed", "job_id": job_id, "text": text})
+    except Exception as e:
+        r.hset(key, mapping={"status": "failed", "error": str(e), "finished_at": time.time()})
+        _publish(r, user_id, {"type": "stt_job_failed", "job_id": job_id, "error": str(e)})
+        raise
+    finally:
+        r.expire(key, JOB_TTL_SECONDS)
+        r.expire(segments_key, JOB_TTL_SECONDS)
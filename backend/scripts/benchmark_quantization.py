@@ -0,0 +1,199 @@
+"""Benchmark int8 dynamic quantization of the Whisper and speaker models.
+
+Run from the backend directory:
+
+    python scripts/benchmark_quantization.py --model base --threads 4
+
+The clips listed in scripts/bench_clips.json are read from --clips-dir
+(default .cache/bench_clips) as <id>.wav or <id>.mp3. Missing clips are
+synthesized with gTTS, which needs the gtts package and network access to
+Google's TTS endpoint; Google may change its voices, so the same text can
+produce different audio over time. For an offline, reproducible benchmark,
+generate the clips once (or record your own) and keep that directory; the
+report lists each clip's SHA-256 so runs can be checked against the same
+audio. For each precision the
+report gives load time, model memory, real-time factor (processing time /
+audio duration) and word error rate against the clip text; the int8 run also
+reports word-error drift against the fp32 transcripts and, for the speaker
+model, cosine similarity between fp32 and int8 embeddings.
+"""
+import argparse
+import gc
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import torch
+
+from app.services.audio_io import SAMPLE_RATE, decode_audio_bytes
+from app.services.model_registry import model_nbytes, rss_bytes
+from app.services.quantization import quantize_model
+
+
+CLIPS_FILE = Path(__file__).with_name("bench_clips.json")
+CLIPS_DIR = Path(".cache/bench_clips")
+
+
+def load_clips(clips_dir: Path = CLIPS_DIR) -> List[Dict]:
+    spec = json.loads(CLIPS_FILE.read_text())
+    clips_dir.mkdir(parents=True, exist_ok=True)
+    clips = []
+    for clip in spec["clips"]:
+        path = next((p for p in (clips_dir / f"{clip['id']}.wav", clips_dir / f"{clip['id']}.mp3") if p.exists()), None)
+        if path is None:
+            path = clips_dir / f"{clip['id']}.mp3"
+            print(f"Synthesizing {path} with gTTS (network)")
+            try:
+                from gtts import gTTS
+
+                gTTS(text=clip["text"], lang=spec["lang"]).save(str(path))
+            except Exception as e:
+                path.unlink(missing_ok=True)
+                sys.exit(f"Clip {clip['id']} is missing from {clips_dir} and gTTS could not synthesize it: {e}")
+        data = path.read_bytes()
+        audio = decode_audio_bytes(data)
+        clips.append({
+            **clip,
+            "audio": audio,
+            "seconds": len(audio) / SAMPLE_RATE,
+            "sha256": hashlib.sha256(data).hexdigest(),
+        })
+    return clips
+
+
+def _words(text: str) -> List[str]:
+    return re.sub(r"[^\w' ]+", " ", text.lower()).split()
+
+
+def _edit_distance(ref: List[str], hyp: List[str]) -> int:
+    row = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, start=1):
+        prev, row[0] = row[0], i
+        for j, h in enumerate(hyp, start=1):
+            prev, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, prev + (r != h))
+    return row[-1]
+
+
+def wer(refs: List[str], hyps: List[str]) -> float:
+    errors = sum(_edit_distance(_words(r), _words(h)) for r, h in zip(refs, hyps))
+    total = sum(len(_words(r)) for r in refs) or 1
+    return errors / total
+
+
+def bench_whisper(name: str, clips: List[Dict], quantized: bool) -> Dict:
+    import whisper
+
+    rss_before = rss_bytes()
+    started = time.perf_counter()
+    model = whisper.load_model(name, device="cpu")
+    if quantized:
+        model = quantize_model("whisper", model)
+    load_seconds = time.perf_counter() - started
+
+    options = dict(language="en", fp16=False, temperature=0.0, condition_on_previous_text=False)
+    model.transcribe(clips[0]["audio"], **options)  # warm-up
+
+    texts, elapsed = [], 0.0
+    for clip in clips:
+        started = time.perf_counter()
+        texts.append(model.transcribe(clip["audio"], **options)["text"].strip())
+        elapsed += time.perf_counter() - started
+
+    report = {
+        "load_seconds": round(load_seconds, 2),
+        "model_mb": round(model_nbytes(model) / 2**20, 1),
+        "rss_delta_mb": round((rss_bytes() - rss_before) / 2**20, 1),
+        "rtf": round(elapsed / sum(c["seconds"] for c in clips), 4),
+        "wer": round(wer([c["text"] for c in clips], texts), 4),
+        "texts": texts,
+    }
+    del model
+    gc.collect()
+    return report
+
+
+def bench_speaker(source: str, clips: List[Dict], quantized: bool) -> Dict:
+    from speechbrain.pretrained import SpeakerRecognition
+
+    rss_before = rss_bytes()
+    started = time.perf_counter()
+    rec = SpeakerRecognition.from_hparams(source=source, savedir=".cache/speechbrain")
+    if quantized:
+        rec = quantize_model("speaker", rec)
+    load_seconds = time.perf_counter() - started
+
+    embeddings, elapsed = [], 0.0
+    with torch.no_grad():
+        rec.encode_batch(torch.from_numpy(clips[0]["audio"]).unsqueeze(0))  # warm-up
+        for clip in clips:
+            started = time.perf_counter()
+            emb = rec.encode_batch(torch.from_numpy(clip["audio"]).unsqueeze(0))
+            elapsed += time.perf_counter() - started
+            embeddings.append(emb.squeeze().cpu().numpy())
+
+    report = {
+        "load_seconds": round(load_seconds, 2),
+        "model_mb": round(model_nbytes(rec) / 2**20, 1),
+        "rss_delta_mb": round((rss_bytes() - rss_before) / 2**20, 1),
+        "rtf": round(elapsed / sum(c["seconds"] for c in clips), 4),
+        "embeddings": np.stack(embeddings),
+    }
+    del rec
+    gc.collect()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default="base", help="Whisper model name")
+    parser.add_argument("--speaker-model", default="speechbrain/spkrec-ecapa-voxceleb")
+    parser.add_argument("--skip-speaker", action="store_true")
+    parser.add_argument("--threads", type=int, default=0, help="torch intra-op threads (0 = default)")
+    parser.add_argument("--json", dest="json_path", help="Also write the report to this file")
+    parser.add_argument("--clips-dir", type=Path, default=CLIPS_DIR, help="Directory of <id>.wav/.mp3 clips")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    clips = load_clips(args.clips_dir)
+    print(f"{len(clips)} clips, {sum(c['seconds'] for c in clips):.1f} s of audio, {torch.get_num_threads()} threads")
+
+    report: Dict = {"whisper": {}, "speaker": {}}
+    fp32 = bench_whisper(args.model, clips, quantized=False)
+    int8 = bench_whisper(args.model, clips, quantized=True)
+    int8["wer_drift"] = round(wer(fp32["texts"], int8["texts"]), 4)
+    report["whisper"] = {"fp32": fp32, "int8": int8}
+
+    if not args.skip_speaker:
+        sp32 = bench_speaker(args.speaker_model, clips, quantized=False)
+        sp8 = bench_speaker(args.speaker_model, clips, quantized=True)
+        a, b = sp32.pop("embeddings"), sp8.pop("embeddings")
+        cosine = np.sum(a * b, axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+        sp8["cosine_mean"] = round(float(cosine.mean()), 4)
+        sp8["cosine_min"] = round(float(cosine.min()), 4)
+        report["speaker"] = {"fp32": sp32, "int8": sp8}
+
+    for kind, runs in report.items():
+        for precision, r in runs.items():
+            extras = {k: v for k, v in r.items() if k not in ("texts",)}
+            print(f"{kind:8s} {precision:5s} " + "  ".join(f"{k}={v}" for k, v in extras.items()))
+    if runs := report["whisper"]:
+        print(f"whisper speedup: {runs['fp32']['rtf'] / max(runs['int8']['rtf'], 1e-9):.2f}x")
+    if runs := report["speaker"]:
+        print(f"speaker speedup: {runs['fp32']['rtf'] / max(runs['int8']['rtf'], 1e-9):.2f}x")
+
+    if args.json_path:
+        report["clips"] = {c["id"]: c["sha256"] for c in clips}
+        Path(args.json_path).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import asyncio
+
+from app.core.config import settings
+from app.services import warmup
+
+
+def _warm_up(monkeypatch, preload: str, ready_requires: str = "") -> warmup.Readiness:
+    monkeypatch.setattr(settings, "INFERENCE_PRELOAD", preload)
+    monkeypatch.setattr(settings, "READY_REQUIRES", ready_requires)
+    monkeypatch.setattr(settings, "SPACY_PRELOAD", "")
+    monkeypatch.setattr(warmup, "get_inference_pool", lambda: None)
+    monkeypatch.setattr(warmup, "readiness", warmup.Readiness())
+    asyncio.run(warmup.warm_up())
+    return warmup.readiness
+
+
+def test_unknown_preload_kind_does_not_block_readiness(monkeypatch):
+    readiness = _warm_up(monkeypatch, "custom:model")
+
+    assert readiness.models["custom:model"]["status"] == "skipped"
+    assert readiness.ready
+    assert readiness.snapshot()["ready"] is True
+
+
+def test_unknown_preload_kind_next_to_warmed_model(monkeypatch):
+    async def warm(name):
+        pass
+
+    monkeypatch.setitem(warmup._WARMERS, "whisper", warm)
+    readiness = _warm_up(monkeypatch, "whisper:base,custom:model")
+
+    assert readiness.models["whisper:base"]["status"] == "ready"
+    assert readiness.models["custom:model"]["status"] == "skipped"
+    assert readiness.ready